@@ -3,6 +3,8 @@ import moderngl
 import numpy as np
 from PIL import Image, ImageShow
 
+from learn_opengl import readback
+
 
 # https://moderngl.readthedocs.io/en/5.8.2/the_guide/rendering.html
 
@@ -71,7 +73,11 @@ def main():
     # vao.render(moderngl.TRIANGLES)
     # vao.render(moderngl.TRIANGLES_ADJACENCY)
 
-    img = Image.frombytes('RGB', fbo.size, fbo.read(), 'raw', 'RGB', 0, -1)
+    # the driver writes the pixels straight into a preallocated array (allocate once, reuse per frame);
+    # read_pixels returns it top row first as a flipped view, without copying
+    pixels = readback.pixel_array(fbo.size, components=3)
+    frame = readback.read_pixels(fbo, pixels)
+    img = Image.fromarray(frame, 'RGB')
     viewer.show(img)
 
 if __name__ == "__main__":
@@ -1,10 +1,12 @@
 from typing import Any
-from PIL import Image, ImageShow
+from PIL import ImageShow
 import moderngl
 import moderngl_window
 from moderngl_window.conf import settings
 import numpy as np
 
+from learn_opengl import geometry, textures
+
 
 # https://learnopengl.com/Getting-started/Textures
 # https://moderngl.readthedocs.io/en/latest/reference/texture.html
@@ -34,7 +36,7 @@ VERTICES = np.array([
 INDICES = np.array([
     0, 1, 2,
     2, 3, 0,
-], dtype=np.float32)
+], dtype=np.uint16)
 
 VERTEX_SHADER = """
     #version 330 core
@@ -72,8 +74,6 @@ FRAGMENT_SHADER = """
 
 
 def main():
-    img = Image.open("./textures/face.png").convert("RGBA").transpose(Image.FLIP_TOP_BOTTOM)
-
     settings.WINDOW["size"] = (512, 512)
     settings.WINDOW["aspect_ratio"] = 1
     settings.WINDOW["title"] = "Hello, Texture!"
@@ -81,14 +81,21 @@ def main():
     window = moderngl_window.create_window_from_settings()
 
     prog = window.ctx.program(vertex_shader=VERTEX_SHADER, fragment_shader=FRAGMENT_SHADER)
-    texture = window.ctx.texture(img.size, components=4, data=img.tobytes())
+    texture = textures.load_texture(window.ctx, "./textures/face.png")
     # Only valid for uniform textures when using Bindless Textures.
     prog["ourTexture"].handle = texture.get_handle()
 
-    vbo = window.ctx.buffer(VERTICES.tobytes())
+    # half float positions and uvs, colors as normalized bytes: 16 bytes per vertex instead of 32
+    vertex_format = "3f2 x2 3f1 x1 2f2"
+    vbo = window.ctx.buffer(geometry.quantize(VERTICES, "3f 3f 2f", vertex_format))
     ibo = window.ctx.buffer(INDICES.tobytes())
-    vao = window.ctx.vertex_array(prog, vbo, "position", "in_color", "in_texture_coords")
-    # vao = window.ctx.vertex_array(prog, vbo, "position", "in_color", "in_texture_coords", index_buffer=ibo)
+    # 2-byte indices, matching the uint16 INDICES
+    vao = window.ctx.vertex_array(
+        prog,
+        [(vbo, vertex_format, "position", "in_color", "in_texture_coords")],
+        index_buffer=ibo,
+        index_element_size=2,
+    )
     print(vao.vertices)
 
     moderngl_window.activate_context(ctx=window.ctx)
@@ -96,8 +103,7 @@ def main():
     while not window.is_closing:
         window.clear()
         # Render stuff here
-        vao.render(moderngl.TRIANGLE_FAN)
-        # vao.render(moderngl.TRIANGLES, vertices=vao.vertices)
+        vao.render(moderngl.TRIANGLES)
         window.swap_buffers()
 
 
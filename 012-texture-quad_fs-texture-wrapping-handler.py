@@ -1,11 +1,13 @@
 from typing import Any
-from PIL import Image, ImageShow
+from PIL import ImageShow
 import moderngl
 import moderngl_window
 from moderngl_window.geometry.attributes import AttributeNames
 from moderngl_window.conf import settings
 import numpy as np
 
+from learn_opengl import textures
+
 
 # https://learnopengl.com/Getting-started/Textures
 # https://moderngl-window.readthedocs.io/en/latest/reference/geometry.html
@@ -59,8 +61,6 @@ FRAGMENT_SHADER = """
 
 
 def main():
-    img = Image.open("./textures/face.png").convert("RGBA").transpose(Image.FLIP_TOP_BOTTOM)
-
     settings.WINDOW["size"] = (512, 512)
     settings.WINDOW["aspect_ratio"] = 1
     settings.WINDOW["title"] = "Hello, Texture!"
@@ -68,7 +68,7 @@ def main():
     window = moderngl_window.create_window_from_settings()
 
     prog = window.ctx.program(vertex_shader=VERTEX_SHADER, fragment_shader=FRAGMENT_SHADER)
-    texture = window.ctx.texture(img.size, components=4, data=img.tobytes())
+    texture = textures.load_texture(window.ctx, "./textures/face.png")
     texture.filter = (moderngl.LINEAR, moderngl.LINEAR)
     texture.repeat_x = False
     texture.repeat_y = False
@@ -1,10 +1,13 @@
-from PIL import Image
 import moderngl
 import moderngl_window
 from moderngl_window.conf import settings
+from moderngl_window.timers.clock import Timer
 from time import perf_counter
 import numpy as np
 
+from learn_opengl import textures
+from learn_opengl.frame_limiter import FrameLimiter
+
 
 # https://learnopengl.com/Getting-started/Transformations
 # https://github.com/moderngl/moderngl/blob/master/examples/simple_camera.py
@@ -58,9 +61,11 @@ FRAGMENT_SHADER = """
 """
 
 
-def main():
-    img = Image.open("./textures/face.png").convert("RGBA").transpose(Image.FLIP_TOP_BOTTOM)
+# Cap the frame rate without vsync (learn_opengl/frame_limiter.py), None runs uncapped
+FPS_LIMIT = None
 
+
+def main():
     settings.WINDOW["size"] = (512, 512)
     settings.WINDOW["aspect_ratio"] = 1
     settings.WINDOW["title"] = "Hello, Rotation!"
@@ -69,7 +74,7 @@ def main():
     window = moderngl_window.create_window_from_settings()
 
     prog = window.ctx.program(vertex_shader=VERTEX_SHADER, fragment_shader=FRAGMENT_SHADER)
-    texture = window.ctx.texture(img.size, components=4, data=img.tobytes())
+    texture = textures.load_texture(window.ctx, "./textures/face.png")
     texture.repeat_x = True
     texture.repeat_y = True
     prog["ourTexture"].handle = texture.get_handle()
@@ -82,6 +87,10 @@ def main():
 
     moderngl_window.activate_context(ctx=window.ctx)
 
+    limiter = FrameLimiter(fps=FPS_LIMIT) if FPS_LIMIT else None
+    # the rotation follows the lesson timer; perf_counter() only measures the frame rate
+    timer = Timer()
+    timer.start()
     time_start = perf_counter()
     time_end = 0
     frames_start = 0
@@ -91,15 +100,21 @@ def main():
         # Render stuff here
         vao.render(moderngl.TRIANGLE_FAN)
         time_end = perf_counter()
-        prog["time"] = time_end
+        prog["time"] = timer.time
         window.swap_buffers()
+        if limiter:
+            # sleep, then spin, until this frame's time slot is over
+            limiter.wait()
 
         # get framerate
         # experiment with vsync=False and vsync=True
         frames_end = window.frames
         if time_end - time_start >= 1.0:  # 1.0s or more elapsed
             fps = (frames_end - frames_start) / (time_end - time_start)
-            print("\r", int(fps), "FPS", end="")
+            if limiter:
+                print("\r", int(fps), "FPS, jitter", f"{limiter.stats()['jitter']:.3f}ms", end="")
+            else:
+                print("\r", int(fps), "FPS", end="")
             time_start = time_end
             frames_start = frames_end
 
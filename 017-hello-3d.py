@@ -1,10 +1,11 @@
 import pyrr
-from PIL import Image
 import moderngl
 import moderngl_window
 from moderngl_window.conf import settings
 import numpy as np
 
+from learn_opengl import textures
+
 
 # https://learnopengl.com/Getting-started/Coordinate-Systems
 # https://codeloop.org/python-modern-opengl-perspective-projection/
@@ -64,8 +65,6 @@ FRAGMENT_SHADER = """
 
 
 def main():
-    img = Image.open("./textures/face.png").convert("RGBA").transpose(Image.FLIP_TOP_BOTTOM)
-
     settings.WINDOW["size"] = (512, 512)
     settings.WINDOW["aspect_ratio"] = 512/512
     settings.WINDOW["title"] = "Hello, 3D!"
@@ -73,7 +72,7 @@ def main():
     window = moderngl_window.create_window_from_settings()
 
     prog = window.ctx.program(vertex_shader=VERTEX_SHADER, fragment_shader=FRAGMENT_SHADER)
-    texture = window.ctx.texture(img.size, components=4, data=img.tobytes())
+    texture = textures.load_texture(window.ctx, "./textures/face.png")
     prog["ourTexture"].handle = texture.get_handle()
 
     vbo = window.ctx.buffer(VERTICES)
@@ -1,11 +1,12 @@
 import pyrr
-from PIL import Image
 import moderngl
 import moderngl_window
 from moderngl_window.conf import settings
 import numpy as np
 from moderngl_window.timers.clock import Timer
 
+from learn_opengl import geometry, programs, textures, uniforms
+
 
 # https://learnopengl.com/Getting-started/Coordinate-Systems
 # https://github.com/moderngl/moderngl-window/blob/master/examples/geometry_cube.py
@@ -58,58 +59,23 @@ VERTICES = np.array([
     -0.5,  0.5, -0.5,  0.0, 1.0
 ], dtype=np.float32)
 
-VERTEX_SHADER = """
-    #version 330 core
-
-    in vec3 position;
-    in vec2 in_texture_coords;
-    
-    uniform mat4 model;
-    uniform mat4 view;
-    uniform mat4 projection;
-
-
-    out vec4 color;
-    out vec2 texture_coord;
-
-    void main()
-    {   
-        gl_Position = projection * view * model * vec4(position.xyz, 1.0);
-        texture_coord = in_texture_coords;
-    }
-"""
-
-FRAGMENT_SHADER = """
-    #version 330 core
-
-    in vec2 texture_coord;
-
-    uniform sampler2D ourTexture;
-
-    out vec4 fragemnt_color;
-
-    void main()
-    {
-        fragemnt_color = texture(ourTexture, texture_coord);
-    } 
-"""
-
 
 def main():
-    img = Image.open("./textures/face.png").convert("RGBA").transpose(Image.FLIP_TOP_BOTTOM)
-
     settings.WINDOW["size"] = (512, 512)
     settings.WINDOW["aspect_ratio"] = 512/512
     settings.WINDOW["title"] = "Hello, Cube!"
 
     window = moderngl_window.create_window_from_settings()
 
-    prog = window.ctx.program(vertex_shader=VERTEX_SHADER, fragment_shader=FRAGMENT_SHADER)
-    texture = window.ctx.texture(img.size, components=4, data=img.tobytes())
+    # learn_opengl/shaders/textured_cube.glsl
+    prog = programs.registry(window.ctx).load("textured_cube")
+    texture = textures.load_texture(window.ctx, "./textures/face.png")
     prog["ourTexture"].handle = texture.get_handle()
 
-    vbo = window.ctx.buffer(VERTICES)
-    vao = window.ctx.vertex_array(prog, vbo, "position", "in_texture_coords")
+    # 36 expanded cube corners -> 16 unique vertices drawn through an index buffer,
+    # packed as half floats: 12 bytes per vertex instead of 20
+    mesh = geometry.index_mesh(VERTICES, "3f 2f").quantized("3f2 x2 2f2")
+    vao = mesh.vertex_array(window.ctx, prog, "position", "in_texture_coords")
 
     # Going 3D paragraph
     # rotate in X axis
@@ -117,12 +83,13 @@ def main():
     prog["model"] = model.flatten()
     # translate in Z axis
     view = pyrr.matrix44.create_from_translation(pyrr.Vector3([0.0,0.0,-3.0] ))
-    prog["view"] = view.flatten()
+    camera_block = uniforms.camera_block(window.ctx)
+    camera_block.update(view=view)
     # create perspective projection
     perspective = pyrr.matrix44.create_perspective_projection(
         fovy=45.0, aspect=512/512, near=0.1, far=100.0
     )
-    prog["projection"] = perspective.flatten()
+    camera_block.update(projection=perspective)
 
     moderngl_window.activate_context(ctx=window.ctx)
 
@@ -1,11 +1,12 @@
 import pyrr
-from PIL import Image
 import moderngl
 import moderngl_window
 from moderngl_window.conf import settings
 import numpy as np
 from moderngl_window.timers.clock import Timer
 
+from learn_opengl import culling, geometry, programs, textures, transforms, uniforms
+
 
 # https://learnopengl.com/Getting-started/Coordinate-Systems
 # https://github.com/moderngl/moderngl-window/blob/master/examples/geometry_cube.py
@@ -58,46 +59,14 @@ VERTICES = np.array([
     -0.5,  0.5, -0.5,  0.0, 1.0
 ], dtype=np.float32)
 
-VERTEX_SHADER = """
-    #version 330 core
-
-    in vec3 position;
-    in vec2 in_texture_coords;
-    
-    uniform mat4 model;
-    uniform mat4 view;
-    uniform mat4 projection;
-
-
-    out vec4 color;
-    out vec2 texture_coord;
-
-    void main()
-    {   
-        gl_Position = projection * view * model * vec4(position.xyz, 1.0);
-        texture_coord = in_texture_coords;
-    }
-"""
-
-FRAGMENT_SHADER = """
-    #version 330 core
-
-    in vec2 texture_coord;
-
-    uniform sampler2D ourTexture;
-
-    out vec4 fragemnt_color;
-
-    void main()
-    {
-        fragemnt_color = texture(ourTexture, texture_coord);
-    } 
-"""
+# Draw all cubes with one instanced draw call instead of one draw call per cube
+INSTANCED = True
+# The first 10 cubes are the lesson's ones, the rest are scattered randomly.
+# Raise it (e.g. to 100_000) to stress-test the instanced path.
+NUM_CUBES = 10
 
 
 def main():
-    img = Image.open("./textures/face.png").convert("RGBA").transpose(Image.FLIP_TOP_BOTTOM)
-
     settings.WINDOW["size"] = (1280, 720)
     settings.WINDOW["aspect_ratio"] = 1280/720
     settings.WINDOW["vsync"] = True
@@ -108,55 +77,81 @@ def main():
     # Enable DEPTH_TEST
     window.ctx.enable(moderngl.DEPTH_TEST)
 
-    prog = window.ctx.program(vertex_shader=VERTEX_SHADER, fragment_shader=FRAGMENT_SHADER)
-    texture = window.ctx.texture(img.size, components=4, data=img.tobytes())
+    # learn_opengl/shaders/textured_cube.glsl
+    prog = programs.registry(window.ctx).load("textured_cube", defines={"INSTANCED": 1} if INSTANCED else None)
+    texture = textures.load_texture(window.ctx, "./textures/face.png")
     prog["ourTexture"].handle = texture.get_handle()
 
-    vbo = window.ctx.buffer(VERTICES)
-    vao = window.ctx.vertex_array(prog, vbo, "position", "in_texture_coords")
+    mesh = geometry.index_mesh(VERTICES, "3f 2f").quantized("3f2 x2 2f2")
 
     # Going 3D paragraph
-    # rotate in X axis
-    model = pyrr.matrix44.create_from_x_rotation(theta=np.deg2rad(45), dtype=np.float32)
-    prog["model"] = model.flatten()
     # translate in Z axis
     view = pyrr.matrix44.create_from_translation(pyrr.Vector3([0.0, 0.0, -3.0]))
-    prog["view"] = view.flatten()
+    camera_block = uniforms.camera_block(window.ctx)
+    camera_block.update(view=view)
     # create perspective projection
     perspective = pyrr.matrix44.create_perspective_projection(
         fovy=60.0, aspect=1280/720, near=0.1, far=100.0
     )
-    prog["projection"] = perspective.flatten()
+    camera_block.update(projection=perspective)
 
     moderngl_window.activate_context(ctx=window.ctx)
 
     cube_positions = np.array(
         [
-            pyrr.matrix44.create_from_translation(pyrr.Vector3([ 0.0,  0.0,  0.0])),
-            pyrr.matrix44.create_from_translation(pyrr.Vector3([ 2.0,  5.0, -15.0])),
-            pyrr.matrix44.create_from_translation(pyrr.Vector3([-1.5, -2.2, -2.5])),
-            pyrr.matrix44.create_from_translation(pyrr.Vector3([-3.8, -2.0, -12.3])),
-            pyrr.matrix44.create_from_translation(pyrr.Vector3([ 2.4, -0.4, -3.5])),
-            pyrr.matrix44.create_from_translation(pyrr.Vector3([-1.7,  3.0, -7.5])),
-            pyrr.matrix44.create_from_translation(pyrr.Vector3([ 1.3, -2.0, -2.5])),
-            pyrr.matrix44.create_from_translation(pyrr.Vector3([ 1.5,  2.0, -2.5])),
-            pyrr.matrix44.create_from_translation(pyrr.Vector3([ 1.5,  0.2, -1.5])),
-            pyrr.matrix44.create_from_translation(pyrr.Vector3([-1.3,  1.0, -1.5])),
+            [ 0.0,  0.0,  0.0],
+            [ 2.0,  5.0, -15.0],
+            [-1.5, -2.2, -2.5],
+            [-3.8, -2.0, -12.3],
+            [ 2.4, -0.4, -3.5],
+            [-1.7,  3.0, -7.5],
+            [ 1.3, -2.0, -2.5],
+            [ 1.5,  2.0, -2.5],
+            [ 1.5,  0.2, -1.5],
+            [-1.3,  1.0, -1.5],
         ],
         dtype=np.float32)
+    if NUM_CUBES > len(cube_positions):
+        rng = np.random.default_rng(1337)
+        extra = rng.uniform([-20.0, -20.0, -60.0], [20.0, 20.0, -2.0], size=(NUM_CUBES - len(cube_positions), 3))
+        cube_positions = np.concatenate([cube_positions, extra]).astype(np.float32)
+    cube_positions = cube_positions[:NUM_CUBES]
+    # just some random rotatation axis per cube
+    idx = np.arange(len(cube_positions), dtype=np.float32)
+    cube_rotation_axis = np.stack([0 + idx, 2 - idx, 0.5 + idx], axis=1)
+    # the view never changes here and a cube's bounding sphere covers all of its rotations,
+    # so the cubes inside the frustum are culled once and only those are transformed and drawn
+    visible = culling.spheres_visible(culling.frustum_planes(view, perspective), cube_positions, mesh.radius)
+    cube_positions, cube_rotation_axis = cube_positions[visible], cube_rotation_axis[visible]
+    # all model matrices, recomputed in place every frame
+    models = transforms.empty_models(len(cube_positions))
+
+    if INSTANCED:
+        # one mat4 per cube, advanced once per instance ("/i")
+        instance_vbo = window.ctx.buffer(reserve=models.nbytes, dynamic=True)
+        vao = mesh.vertex_array(
+            window.ctx, prog, "position", "in_texture_coords", instances=[(instance_vbo, "16f/i", "model")]
+        )
+    else:
+        vao = mesh.vertex_array(window.ctx, prog, "position", "in_texture_coords")
 
     timer = Timer()
     timer.start()
     while not window.is_closing:
         window.clear()
         # Render stuff here
-        for idx, cube in enumerate(cube_positions):
-            vao.render(moderngl.TRIANGLES)
-            # just some random rotatation
-            model_rot = pyrr.matrix44.create_from_axis_rotation(axis=np.array([0+idx, 2-idx, 0.5+idx]),
-                                                                theta=np.deg2rad(50*timer.time),
-                                                                dtype=np.float32)
-            prog["model"] = (model_rot.dot(cube)).flatten()
+        transforms.from_axis_rotations(
+            cube_positions, cube_rotation_axis, np.deg2rad(50*timer.time), out=models
+        )
+        if INSTANCED:
+            # single upload and single draw call for the whole field
+            instance_vbo.write(models)
+            vao.render(moderngl.TRIANGLES, instances=len(models))
+        else:
+            for model in models:
+                # set the model before drawing, otherwise each cube gets the previous cube's matrix
+                prog["model"] = model.flatten()
+                vao.render(moderngl.TRIANGLES)
         window.swap_buffers()
 
 
@@ -1,11 +1,12 @@
 import pyrr
-from PIL import Image
 import moderngl
 import moderngl_window
 from moderngl_window.conf import settings
 import numpy as np
 from moderngl_window.timers.clock import Timer
 
+from learn_opengl import culling, geometry, gpu_culling, programs, textures, transforms, uniforms
+
 
 # https://learnopengl.com/Getting-started/Coordinate-Systems
 # https://github.com/moderngl/moderngl-window/blob/master/examples/geometry_cube.py
@@ -58,46 +59,17 @@ VERTICES = np.array([
     -0.5,  0.5, -0.5,  0.0, 1.0
 ], dtype=np.float32)
 
-VERTEX_SHADER = """
-    #version 330 core
-
-    in vec3 position;
-    in vec2 in_texture_coords;
-    
-    uniform mat4 model;
-    uniform mat4 view;
-    uniform mat4 projection;
-
-
-    out vec4 color;
-    out vec2 texture_coord;
-
-    void main()
-    {   
-        gl_Position = projection * view * model * vec4(position.xyz, 1.0);
-        texture_coord = in_texture_coords;
-    }
-"""
-
-FRAGMENT_SHADER = """
-    #version 330 core
-
-    in vec2 texture_coord;
-
-    uniform sampler2D ourTexture;
-
-    out vec4 fragemnt_color;
-
-    void main()
-    {
-        fragemnt_color = texture(ourTexture, texture_coord);
-    } 
-"""
+# Draw all cubes with one instanced draw call instead of one draw call per cube
+INSTANCED = True
+# The first 10 cubes are the lesson's ones, the rest are scattered randomly.
+# Raise it (e.g. to 100_000) to stress-test the instanced path.
+NUM_CUBES = 10
+# With INSTANCED, rotate and cull the cubes on the GPU every frame and draw the visible
+# ones with an indirect draw instead of culling once on the CPU (needs OpenGL 4.3)
+GPU_CULLING = False
 
 
 def main():
-    img = Image.open("./textures/face.png").convert("RGBA").transpose(Image.FLIP_TOP_BOTTOM)
-
     settings.WINDOW["size"] = (1280, 720)
     settings.WINDOW["aspect_ratio"] = 1280/720
     settings.WINDOW["vsync"] = True
@@ -108,25 +80,23 @@ def main():
     # Enable DEPTH_TEST
     window.ctx.enable(moderngl.DEPTH_TEST)
 
-    prog = window.ctx.program(vertex_shader=VERTEX_SHADER, fragment_shader=FRAGMENT_SHADER)
-    texture = window.ctx.texture(img.size, components=4, data=img.tobytes())
+    # learn_opengl/shaders/textured_cube.glsl
+    prog = programs.registry(window.ctx).load("textured_cube", defines={"INSTANCED": 1} if INSTANCED else None)
+    texture = textures.load_texture(window.ctx, "./textures/face.png")
     prog["ourTexture"].handle = texture.get_handle()
 
-    vbo = window.ctx.buffer(VERTICES)
-    vao = window.ctx.vertex_array(prog, vbo, "position", "in_texture_coords")
+    mesh = geometry.index_mesh(VERTICES, "3f 2f").quantized("3f2 x2 2f2")
 
     # Going 3D paragraph
-    # rotate in X axis
-    model = pyrr.matrix44.create_from_x_rotation(theta=np.deg2rad(45), dtype=np.float32)
-    prog["model"] = model.flatten()
     # translate in Z axis
     view = pyrr.matrix44.create_from_translation(pyrr.Vector3([0.0, 0.0, -3.0]))
-    prog["view"] = view.flatten()
+    camera_block = uniforms.camera_block(window.ctx)
+    camera_block.update(view=view)
     # create perspective projection
     perspective = pyrr.matrix44.create_perspective_projection(
         fovy=60.0, aspect=1280/720, near=0.1, far=100.0
     )
-    prog["projection"] = perspective.flatten()
+    camera_block.update(projection=perspective)
 
     moderngl_window.activate_context(ctx=window.ctx)
 
@@ -144,23 +114,60 @@ def main():
             [-1.3,  1.0, -1.5],
         ],
         dtype=np.float32)
+    if NUM_CUBES > len(cube_positions):
+        rng = np.random.default_rng(1337)
+        extra = rng.uniform([-20.0, -20.0, -60.0], [20.0, 20.0, -2.0], size=(NUM_CUBES - len(cube_positions), 3))
+        cube_positions = np.concatenate([cube_positions, extra]).astype(np.float32)
+    cube_positions = cube_positions[:NUM_CUBES]
+    if not (INSTANCED and GPU_CULLING):
+        # the view never changes here and a cube's bounding sphere covers all of its rotations,
+        # so the cubes inside the frustum are culled once and only those are transformed and drawn
+        visible = culling.spheres_visible(culling.frustum_planes(view, perspective), cube_positions, mesh.radius)
+        cube_positions = cube_positions[visible]
+    # all model matrices, recomputed in place every frame
+    models = transforms.empty_models(len(cube_positions))
+
+    if INSTANCED:
+        if GPU_CULLING:
+            # position and euler angles of every cube, uploaded once: the culling pass
+            # builds the model matrices from them and packs the visible ones
+            eulers = np.broadcast_to(np.float32([1.0, 0.0, 0.0]), cube_positions.shape)
+            cubes = window.ctx.buffer(np.hstack([cube_positions, eulers]))
+            culler = gpu_culling.GpuCuller(window.ctx, cubes, len(models), mesh.radius, len(mesh.indices), eulers=True)
+            instance_vbo = culler.visible
+        else:
+            # one mat4 per cube, advanced once per instance ("/i")
+            instance_vbo = window.ctx.buffer(reserve=models.nbytes, dynamic=True)
+        vao = mesh.vertex_array(
+            window.ctx, prog, "position", "in_texture_coords", instances=[(instance_vbo, "16f/i", "model")]
+        )
+    else:
+        vao = mesh.vertex_array(window.ctx, prog, "position", "in_texture_coords")
 
     timer = Timer()
     timer.start()
     while not window.is_closing:
         window.clear()
         # Render stuff here
-        for cube in cube_positions:
-            vao.render(moderngl.TRIANGLES)
-            # just some random rotatation
-            model = pyrr.matrix44.create_identity(dtype=np.float32)
-            #   X,    Z,    Y
-            # Pitch, Roll, Yaw
-            model_rotate = pyrr.matrix44.create_from_eulers([timer.time, 0, 0], dtype=np.float32)
-            model = model.dot(model_rotate)
-            model_translate = pyrr.matrix44.create_from_translation(pyrr.Vector3(cube))
-            model = model.dot(model_translate)
-            prog["model"] = model.flatten()
+        if INSTANCED and GPU_CULLING:
+            # the culling pass rotates the cubes, the CPU only sends the time
+            camera_block.update(time=timer.time)
+            culler.cull(view, perspective)
+            culler.render(vao)
+            window.swap_buffers()
+            continue
+        #   X,    Z,    Y
+        # Pitch, Roll, Yaw
+        transforms.from_eulers(cube_positions, [1.0, 0.0, 0.0], timer.time, out=models)
+        if INSTANCED:
+            # single upload and single draw call for the whole field
+            instance_vbo.write(models)
+            vao.render(moderngl.TRIANGLES, instances=len(models))
+        else:
+            for model in models:
+                # set the model before drawing, otherwise each cube gets the previous cube's matrix
+                prog["model"] = model.flatten()
+                vao.render(moderngl.TRIANGLES)
         window.swap_buffers()
 
 
@@ -1,11 +1,12 @@
 import pyrr
-from PIL import Image
 import moderngl
 import moderngl_window
 from moderngl_window.conf import settings
 import numpy as np
 from moderngl_window.timers.clock import Timer
 
+from learn_opengl import culling, geometry, programs, render_queue, textures, transforms, uniforms
+
 
 # https://learnopengl.com/Getting-started/Coordinate-Systems
 # https://github.com/moderngl/moderngl-window/blob/master/examples/geometry_cube.py
@@ -60,46 +61,16 @@ VERTICES = np.array([
     -0.5,  0.5, -0.5,  0.0, 1.0
 ], dtype=np.float32)
 
-VERTEX_SHADER = """
-    #version 330 core
-
-    in vec3 position;
-    in vec2 in_texture_coords;
-    
-    uniform mat4 model;
-    uniform mat4 view;
-    uniform mat4 projection;
-
-
-    out vec4 color;
-    out vec2 texture_coord;
-
-    void main()
-    {   
-        gl_Position = projection * view * model * vec4(position.xyz, 1.0);
-        texture_coord = in_texture_coords;
-    }
-"""
-
-FRAGMENT_SHADER = """
-    #version 330 core
-
-    in vec2 texture_coord;
-
-    uniform sampler2D ourTexture;
-
-    out vec4 fragemnt_color;
-
-    void main()
-    {
-        fragemnt_color = texture(ourTexture, texture_coord);
-    } 
-"""
+# Draw all cubes with one instanced draw call instead of one draw call per cube
+INSTANCED = True
+# The first 10 cubes are the lesson's ones, the rest are scattered randomly.
+# Raise it (e.g. to 100_000) to stress-test the instanced path.
+NUM_CUBES = 10
+# Cube i is textured with MATERIALS[i % len(MATERIALS)]
+MATERIALS = ["./textures/face.png", "./textures/container.png", "./textures/container_specular.png"]
 
 
 def main():
-    img = Image.open("./textures/face.png").convert("RGBA").transpose(Image.FLIP_TOP_BOTTOM)
-
     settings.WINDOW["size"] = (1280, 720)
     settings.WINDOW["aspect_ratio"] = 1280/720
     settings.WINDOW["vsync"] = True
@@ -110,25 +81,29 @@ def main():
     # Enable DEPTH_TEST
     window.ctx.enable(moderngl.DEPTH_TEST)
 
-    prog = window.ctx.program(vertex_shader=VERTEX_SHADER, fragment_shader=FRAGMENT_SHADER)
-    texture = window.ctx.texture(img.size, components=4, data=img.tobytes())
-    prog["ourTexture"].handle = texture.get_handle()
+    # learn_opengl/shaders/textured_cube.glsl
+    if INSTANCED:
+        prog = programs.registry(window.ctx).load("textured_cube", defines={"INSTANCED": 1, "TEXTURE_ARRAY": 1})
+        # all materials as layers of one texture, bound once for every draw
+        texture_array = textures.load_texture_array(window.ctx, MATERIALS)
+        texture_array.use(location=0)
+        prog["ourTextures"] = 0
+    else:
+        prog = programs.registry(window.ctx).load("textured_cube")
+        materials = [textures.load_texture(window.ctx, path) for path in MATERIALS]
 
-    vbo = window.ctx.buffer(VERTICES)
-    vao = window.ctx.vertex_array(prog, vbo, "position", "in_texture_coords")
+    mesh = geometry.index_mesh(VERTICES, "3f 2f").quantized("3f2 x2 2f2")
 
     # Going 3D paragraph
-    # rotate in X axis
-    model = pyrr.matrix44.create_from_x_rotation(theta=np.deg2rad(45), dtype=np.float32)
-    prog["model"] = model.flatten()
     # translate in Z axis
     view = pyrr.matrix44.create_from_translation(pyrr.Vector3([0.0, 0.0, -3.0]))
-    prog["view"] = view.flatten()
+    camera_block = uniforms.camera_block(window.ctx)
+    camera_block.update(view=view)
     # create perspective projection
     perspective = pyrr.matrix44.create_perspective_projection(
         fovy=60.0, aspect=1280/720, near=0.1, far=100.0
     )
-    prog["projection"] = perspective.flatten()
+    camera_block.update(projection=perspective)
 
     moderngl_window.activate_context(ctx=window.ctx)
 
@@ -146,25 +121,56 @@ def main():
             [-1.3,  1.0, -1.5],
         ],
         dtype=np.float32)
+    if NUM_CUBES > len(cube_positions):
+        rng = np.random.default_rng(1337)
+        extra = rng.uniform([-20.0, -20.0, -60.0], [20.0, 20.0, -2.0], size=(NUM_CUBES - len(cube_positions), 3))
+        cube_positions = np.concatenate([cube_positions, extra]).astype(np.float32)
+    cube_positions = cube_positions[:NUM_CUBES]
     cube_rotation_axis = np.random.random(size=cube_positions.shape).astype(dtype=np.float32)
+    cube_layers = np.arange(len(cube_positions), dtype=np.int32) % len(MATERIALS)
+    # the view never changes here and a cube's bounding sphere covers all of its rotations,
+    # so the cubes inside the frustum are culled once and only those are transformed and drawn
+    visible = culling.spheres_visible(culling.frustum_planes(view, perspective), cube_positions, mesh.radius)
+    cube_positions, cube_rotation_axis, cube_layers = (
+        cube_positions[visible], cube_rotation_axis[visible], cube_layers[visible]
+    )
+    # all model matrices, recomputed in place every frame
+    models = transforms.empty_models(len(cube_positions))
+
+    if INSTANCED:
+        # one mat4 and one texture layer per cube, advanced once per instance ("/i")
+        instance_vbo = window.ctx.buffer(reserve=models.nbytes, dynamic=True)
+        layer_vbo = window.ctx.buffer(cube_layers)
+        vao = mesh.vertex_array(
+            window.ctx,
+            prog,
+            "position",
+            "in_texture_coords",
+            instances=[(instance_vbo, "16f/i", "model"), (layer_vbo, "1i/i", "in_layer")],
+        )
+    else:
+        vao = mesh.vertex_array(window.ctx, prog, "position", "in_texture_coords")
+        # draws sorted by material: one texture bind per material instead of one per cube
+        queue = render_queue.RenderQueue()
 
     timer = Timer()
     timer.start()
     while not window.is_closing:
         window.clear()
         # Render stuff here
-        for cube, rot in zip(cube_positions, cube_rotation_axis):
-            vao.render(moderngl.TRIANGLES)
-            # just some random rotatation
-            model = pyrr.matrix44.create_identity(dtype=np.float32)
-            #   X,    Z,    Y
-            # Pitch, Roll, Yaw
-            model_rotate = pyrr.matrix44.create_from_eulers(rot*timer.time,
-                                                            dtype=np.float32)
-            model = model.dot(model_rotate)
-            model_translate = pyrr.matrix44.create_from_translation(pyrr.Vector3(cube))
-            model = model.dot(model_translate)
-            prog["model"] = model.flatten()
+        # just some random rotatation
+        #   X,    Z,    Y
+        # Pitch, Roll, Yaw
+        transforms.from_eulers(cube_positions, cube_rotation_axis, timer.time, out=models)
+        if INSTANCED:
+            # single upload and single draw call for the whole field
+            instance_vbo.write(models)
+            vao.render(moderngl.TRIANGLES, instances=len(models))
+        else:
+            for model, layer in zip(models, cube_layers):
+                # each cube brings its own model matrix, written right before its draw
+                queue.submit(vao, textures=[materials[layer]], uniforms={"model": model}, mode=moderngl.TRIANGLES)
+            queue.flush()
         window.swap_buffers()
 
 
@@ -6,6 +6,10 @@ import moderngl
 import moderngl_window
 import numpy as np
 
+from learn_opengl import geometry, programs, startup, textures, uniforms
+from learn_opengl.camera import Camera
+from learn_opengl.timestep import FixedTimestep
+
 
 # https://learnopengl.com/Getting-started/Camera
 # https://moderngl-window.readthedocs.io/en/latest/guide/basic_usage.html
@@ -58,42 +62,6 @@ VERTICES = np.array([
     -0.5,  0.5, -0.5,  0.0, 1.0
 ], dtype=np.float32)
 
-VERTEX_SHADER = """
-    #version 330 core
-
-    in vec3 position;
-    in vec2 in_texture_coords;
-    
-    uniform mat4 model;
-    uniform mat4 view;
-    uniform mat4 projection;
-
-
-    out vec4 color;
-    out vec2 texture_coord;
-
-    void main()
-    {   
-        gl_Position = projection * view * model * vec4(position.xyz, 1.0);
-        texture_coord = in_texture_coords;
-    }
-"""
-
-FRAGMENT_SHADER = """
-    #version 330 core
-
-    in vec2 texture_coord;
-
-    uniform sampler2D ourTexture;
-
-    out vec4 fragemnt_color;
-
-    void main()
-    {
-        fragemnt_color = texture(ourTexture, texture_coord);
-    } 
-"""
-
 
 class Window(moderngl_window.WindowConfig):
     window_size = (512, 512)
@@ -105,44 +73,39 @@ class Window(moderngl_window.WindowConfig):
 
     def __init__(self,**kwargs):
         super().__init__(**kwargs)
+        startup.watch(self.wnd)
 
         # Enable DEPTH_TEST
         self.ctx.enable(moderngl.DEPTH_TEST)
 
-        self.prog = self.ctx.program(vertex_shader=VERTEX_SHADER,
-                                     fragment_shader=FRAGMENT_SHADER)
+        # learn_opengl/shaders/textured_cube.glsl
+        self.prog = programs.registry(self.ctx).load("textured_cube")
 
-        self.texture = self.load_texture_2d("face.png")
+        self.texture = textures.load_texture(self.ctx, self.resource_dir / "face.png")
         self.prog["ourTexture"].handle = self.texture.get_handle()
 
-        self.vbo = self.ctx.buffer(VERTICES)
-        self.vao = self.ctx.vertex_array(self.prog, self.vbo, "position", "in_texture_coords")
+        self.mesh = geometry.index_mesh(VERTICES, "3f 2f").quantized("3f2 x2 2f2")
+        self.vao = self.mesh.vertex_array(self.ctx, self.prog, "position", "in_texture_coords")
 
         # Starting position of the Cube
         model = pyrr.matrix44.create_identity(dtype=np.float32)
         self.prog["model"] = model.flatten()
-        # Setting-up camera
-        self.eye = [0, 0, 3]
-        self.target = [0, 0, 0]
-        self.up = [0, 1, 0]
-        self.look_at = pyrr.matrix44.create_look_at(
-            eye=self.eye,
-            target=self.target,
-            up=self.up,
-            dtype=np.float32
-        )
-        self.prog["view"] = self.look_at.flatten()
+        # Setting-up camera, looking down -Z from (0, 0, 3).
+        # Movement is simulated in fixed steps, whatever the frame rate, and the
+        # view camera is placed between the last two simulated positions
+        self.clock = FixedTimestep(rate=120.0)
+        self.camera = Camera(position=(0.0, 0.0, 3.0))
+        self.view_camera = Camera(position=(0.0, 0.0, 3.0))
+        self.previous_state = self.camera.state
+        self.camera_block = uniforms.camera_block(self.ctx)
         # create perspective projection
         perspective = pyrr.matrix44.create_perspective_projection(
             fovy=45.0, aspect=512/512, near=0.1, far=100.0
         )
-        self.prog["projection"] = perspective.flatten()
+        self.camera_block.update(projection=perspective)
 
-        self.speed = 0.05
-        # forward-backward
-        self.WS = 0
-        # left-right strafe
-        self.AD = 0
+        # units per second
+        self.speed = 3.0
 
 
     def key_event(self, key: Any, action: Any, modifiers: KeyModifiers):
@@ -150,46 +113,30 @@ class Window(moderngl_window.WindowConfig):
         ...
 
 
-    def update_coords(self):
-        self.eye = [
-            self.eye[0]-(self.AD*self.speed),
-            0,
-            self.eye[2]-(self.WS*self.speed)
-        ]
-        self.target = [
-            self.target[0]-(self.AD*self.speed),
-            0,
-            0
-        ]
-        self.AD = 0
-        self.WS = 0
-
-
-    def render(self, time: float, frame_time: float):
-        # Render stuff here
-        self.vao.render(moderngl.TRIANGLES)
-        self.look_at = pyrr.matrix44.create_look_at(
-            eye=self.eye,
-            target=self.target,
-            up=self.up,
-            dtype=np.float32
-        )
-
-        self.prog["view"] = self.look_at.flatten()
-
+    def update(self, dt: float):
         # make simple forward-backward and strafe moves
+        step = self.speed * dt
         if self.wnd.is_key_pressed(self.wnd.keys.W):
-            self.WS = 1
-            self.update_coords()
+            self.camera.move(forward=step)
         if self.wnd.is_key_pressed(self.wnd.keys.S):
-            self.WS = -1
-            self.update_coords()
+            self.camera.move(forward=-step)
         if self.wnd.is_key_pressed(self.wnd.keys.A):
-            self.AD = 1
-            self.update_coords()
+            self.camera.move(right=-step)
         if self.wnd.is_key_pressed(self.wnd.keys.D):
-            self.AD = -1
-            self.update_coords()
+            self.camera.move(right=step)
+
+
+    def render(self, time: float, frame_time: float):
+        for _ in range(self.clock.advance(frame_time)):
+            self.previous_state = self.camera.state
+            self.update(self.clock.dt)
+        self.view_camera.set_between(self.previous_state, self.camera.state, self.clock.alpha)
+        # the view is only rebuilt and uploaded after the camera moved
+        if self.view_camera.dirty:
+            self.camera_block.update(view=self.view_camera.view, eye=self.view_camera.position)
+
+        # Render stuff here
+        self.vao.render(moderngl.TRIANGLES)
 
 
 if __name__ == "__main__":
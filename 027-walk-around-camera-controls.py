@@ -4,6 +4,10 @@ import pyrr
 import moderngl
 import moderngl_window
 
+from learn_opengl import geometry, programs, startup, textures, uniforms
+from learn_opengl.camera import Camera
+from learn_opengl.timestep import FixedTimestep
+
 
 # https://learnopengl.com/Getting-started/Camera
 # https://moderngl-window.readthedocs.io/en/latest/guide/basic_usage.html
@@ -57,42 +61,6 @@ VERTICES = np.array([
 ], dtype=np.float32)
 # fmt: on
 
-VERTEX_SHADER = """
-    #version 330 core
-
-    in vec3 position;
-    in vec2 in_texture_coords;
-    
-    uniform mat4 model;
-    uniform mat4 view;
-    uniform mat4 projection;
-
-
-    out vec4 color;
-    out vec2 texture_coord;
-
-    void main()
-    {   
-        gl_Position = projection * view * model * vec4(position.xyz, 1.0);
-        texture_coord = in_texture_coords;
-    }
-"""
-
-FRAGMENT_SHADER = """
-    #version 330 core
-
-    in vec2 texture_coord;
-
-    uniform sampler2D ourTexture;
-
-    out vec4 fragemnt_color;
-
-    void main()
-    {
-        fragemnt_color = texture(ourTexture, texture_coord);
-    } 
-"""
-
 
 class Window(moderngl_window.WindowConfig):
     window_size = (512, 512)
@@ -103,117 +71,74 @@ class Window(moderngl_window.WindowConfig):
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
+        startup.watch(self.wnd)
 
         # Enable DEPTH_TEST
         self.ctx.enable(moderngl.DEPTH_TEST)
 
-        self.prog = self.ctx.program(
-            vertex_shader=VERTEX_SHADER, fragment_shader=FRAGMENT_SHADER
-        )
+        # learn_opengl/shaders/textured_cube.glsl
+        self.prog = programs.registry(self.ctx).load("textured_cube")
 
-        self.texture = self.load_texture_2d("face.png")
+        self.texture = textures.load_texture(self.ctx, self.resource_dir / "face.png")
         self.prog["ourTexture"].handle = self.texture.get_handle()
 
-        self.vbo = self.ctx.buffer(VERTICES)
-        self.vao = self.ctx.vertex_array(
-            self.prog, self.vbo, "position", "in_texture_coords"
+        self.mesh = geometry.index_mesh(VERTICES, "3f 2f").quantized("3f2 x2 2f2")
+        self.vao = self.mesh.vertex_array(
+            self.ctx, self.prog, "position", "in_texture_coords"
         )
 
         # Starting position of the Cube
         model = pyrr.matrix44.create_identity(dtype=np.float32)
         self.prog["model"] = model.flatten()
-        # Setting-up camera
-        self.eye = np.array([0, 0, 3], dtype=np.float32)  # cameraPos
-        self.target = np.array([0, 0, -1], dtype=np.float32)  # cameraFront
-        self.up = np.array([0, 1, 0], dtype=np.float32)  # cameraUp
-        self.look_at = pyrr.matrix44.create_look_at(
-            eye=self.eye, target=self.target, up=self.up, dtype=np.float32
-        )
-        self.prog["view"] = self.look_at.flatten()
+        # Setting-up camera, looking down -Z from (0, 0, 3).
+        # Movement is simulated in fixed steps, whatever the frame rate, and the
+        # view camera is placed between the last two simulated states
+        self.clock = FixedTimestep(rate=120.0)
+        self.camera = Camera(position=(0.0, 0.0, 3.0))
+        self.view_camera = Camera(position=(0.0, 0.0, 3.0))
+        self.previous_state = self.camera.state
+        self.camera_block = uniforms.camera_block(self.ctx)
         # create perspective projection
         perspective = pyrr.matrix44.create_perspective_projection(
             fovy=45.0, aspect=512 / 512, near=0.1, far=100.0
         )
-        self.prog["projection"] = perspective.flatten()
-
-        # create camera view state
-        # fmt: off
-        self.camera = {
-            # x rot       y rot         z rot
-            "roll": 0.0, "pitch": 0.0, "yaw": 0.0,
-        }
-        # fmt: on
-        self.target_unit = self.target
-
-        self.linear_speed = 0.05
-        self.angle_speed = 1.0
-        # forward-backward
-        self.WS = 0.0
-        # left-right strafing
-        self.AD = 0.0
-        # left-right rotation
-        self.QE = 0.0
+        self.camera_block.update(projection=perspective)
 
-    def process_keys(self):
+        # units per second
+        self.linear_speed = 3.0
+        # degrees per second
+        self.angle_speed = 60.0
+
+    def process_keys(self, dt: float):
+        step = self.linear_speed * dt
+        turn = self.angle_speed * dt
+        # forward-backward
         if self.wnd.is_key_pressed(self.wnd.keys.W):
-            self.WS = 1.0
-            self.update_coords()
+            self.camera.move(forward=step)
         if self.wnd.is_key_pressed(self.wnd.keys.S):
-            self.WS = -1.0
-            self.update_coords()
+            self.camera.move(forward=-step)
+        # left-right strafing
         if self.wnd.is_key_pressed(self.wnd.keys.A):
-            self.AD = 1.0
-            self.update_coords()
+            self.camera.move(right=-step)
         if self.wnd.is_key_pressed(self.wnd.keys.D):
-            self.AD = -1.0
-            self.update_coords()
+            self.camera.move(right=step)
+        # left-right rotation
         if self.wnd.is_key_pressed(self.wnd.keys.Q):
-            self.QE = 1.0
-            self.update_coords()
+            self.camera.rotate(yaw=-turn)
         if self.wnd.is_key_pressed(self.wnd.keys.E):
-            self.QE = -1.0
-            self.update_coords()
-
-    def update_coords(self):
-        # 1. update target_unit via pitch, roll, yaw
-        # 1.1 yaw
-        self.camera["yaw"] += self.QE * self.angle_speed
-        self.camera["yaw"] %= 360
-        self.target_unit[0] = -np.sin(np.deg2rad(180 - self.camera["yaw"]))
-        self.target_unit[2] = np.cos(np.deg2rad(180 - self.camera["yaw"]))
-
-        # 2. update eye via strafings and forward/backward moves
-        # 1.1 update forward/backward
-        self.eye[0] -= (self.WS * self.linear_speed) * np.sin(
-            np.deg2rad(self.camera["yaw"])
-        )
-        self.eye[2] -= (self.WS * self.linear_speed) * np.cos(
-            np.deg2rad(self.camera["yaw"])
-        )
-        # 1.2 update strafings
-        self.eye[0] -= (self.AD * self.linear_speed) * -np.cos(
-            np.deg2rad(180 - self.camera["yaw"])
-        )
-        self.eye[2] -= (self.AD * self.linear_speed) * -np.sin(
-            np.deg2rad(180 - self.camera["yaw"])
-        )
-
-        # 3. update target
-        self.target = self.eye + self.target_unit
-
-        # 4. reset
-        self.AD = 0
-        self.WS = 0
-        self.QE = 0
+            self.camera.rotate(yaw=turn)
 
     def render(self, time: float, frame_time: float):
+        for _ in range(self.clock.advance(frame_time)):
+            self.previous_state = self.camera.state
+            self.process_keys(self.clock.dt)
+        self.view_camera.set_between(self.previous_state, self.camera.state, self.clock.alpha)
+        # the view is only rebuilt and uploaded after the camera moved
+        if self.view_camera.dirty:
+            self.camera_block.update(view=self.view_camera.view, eye=self.view_camera.position)
+
         # Render stuff here
         self.vao.render(moderngl.TRIANGLES)
-        self.look_at = pyrr.matrix44.create_look_at(
-            eye=self.eye, target=self.target, up=self.up, dtype=np.float32
-        )
-        self.prog["view"] = self.look_at.flatten()
-        self.process_keys()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,105 @@
+"""Microbenchmark: per-object frustum test loop vs. learn_opengl.culling, under a turning camera.
+
+    python benchmarks/bench_culling.py
+    python benchmarks/bench_culling.py --sizes 1000000 --min-time 1
+
+Objects are unit cubes (bounding sphere radius sqrt(3)/2) scattered around the
+camera, which turns a little between measurements the way the mouse-look
+lessons do, so most of them are behind or beside it. "cull + compact" includes
+gathering the visible model matrices into the array uploaded to the instance
+buffer. The Python loop alone takes several seconds at N = 1M.
+"""
+import argparse
+import sys
+from itertools import count
+from pathlib import Path
+from time import perf_counter
+
+import numpy as np
+import pyrr
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from learn_opengl import culling, transforms  # noqa: E402
+
+RADIUS = np.sqrt(3.0) / 2.0
+
+
+def loop_visible(planes, centers, radius):
+    # the per-object test written the straightforward way
+    visible = np.zeros(len(centers), dtype=bool)
+    for idx, center in enumerate(centers):
+        for a, b, c, d in planes:
+            if a * center[0] + b * center[1] + c * center[2] + d < -radius:
+                break
+        else:
+            visible[idx] = True
+    return visible
+
+
+def measure(fn, min_time):
+    """Best-of wall time per call, repeating until ``min_time`` seconds are spent."""
+    best = float("inf")
+    spent = 0.0
+    while spent < min_time:
+        start = perf_counter()
+        fn()
+        elapsed = perf_counter() - start
+        best = min(best, elapsed)
+        spent += elapsed
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 100_000, 1_000_000])
+    parser.add_argument("--extent", type=float, default=100.0, help="objects lie in [-extent, extent]^3")
+    parser.add_argument("--min-time", type=float, default=0.2, help="seconds spent per measurement")
+    parser.add_argument("--skip-loop", action="store_true", help="only time the vectorized path")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(1337)
+    projection = pyrr.matrix44.create_perspective_projection(
+        fovy=45.0, aspect=1280 / 720, near=0.1, far=100.0, dtype=np.float32
+    )
+    eye = np.array([0.0, 0.0, 3.0], dtype=np.float32)
+    up = np.array([0.0, 1.0, 0.0], dtype=np.float32)
+    yaws = count()
+
+    def view():
+        # a new camera direction every call, like a mouse-look frame
+        yaw = np.deg2rad(next(yaws) * 7.0)
+        front = np.array([np.sin(yaw), 0.0, -np.cos(yaw)], dtype=np.float32)
+        return pyrr.matrix44.create_look_at(eye=eye, target=eye + front, up=up, dtype=np.float32)
+
+    print(f"{'N':>9} {'visible':>8} {'loop':>12} {'cull':>12} {'cull+compact':>13} {'speedup':>9}")
+    for size in args.sizes:
+        positions = rng.uniform(-args.extent, args.extent, size=(size, 3)).astype(np.float32)
+        models = transforms.from_eulers(positions, rng.random((size, 3)))
+
+        planes = culling.frustum_planes(view(), projection)
+        visible = culling.spheres_visible(planes, positions, RADIUS)
+        loop_time = float("nan")
+        if not args.skip_loop:
+            if not np.array_equal(loop_visible(planes, positions, RADIUS), visible):
+                raise AssertionError(f"vectorized culling does not match the loop at N={size}")
+            loop_time = measure(
+                lambda: loop_visible(culling.frustum_planes(view(), projection), positions, RADIUS), args.min_time
+            )
+
+        cull_time = measure(
+            lambda: culling.spheres_visible(culling.frustum_planes(view(), projection), positions, RADIUS),
+            args.min_time,
+        )
+        compact_time = measure(
+            lambda: models[culling.spheres_visible(culling.frustum_planes(view(), projection), positions, RADIUS)],
+            args.min_time,
+        )
+        print(
+            f"{size:>9} {visible.mean():>7.1%} {loop_time * 1e3:>10.3f}ms {cull_time * 1e3:>10.3f}ms"
+            f" {compact_time * 1e3:>11.3f}ms {loop_time / cull_time:>8.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
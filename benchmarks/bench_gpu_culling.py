@@ -0,0 +1,126 @@
+"""Benchmark: drawing a static cube field under a turning camera with no culling, CPU culling and GPU culling.
+
+    python benchmarks/bench_gpu_culling.py
+    python benchmarks/bench_gpu_culling.py --cubes 100000 --frames 60 --no-baseline
+
+"cpu" culls with learn_opengl.culling, gathers the visible model matrices and
+uploads them every frame; "gpu" runs learn_opengl.gpu_culling's transform
+feedback pass and draws with render_indirect, the models never leave the GPU.
+"submit" is the CPU time spent issuing the frame, "frame" includes waiting for
+it to finish. Drawing all 1M cubes ("none") is very slow under llvmpipe, skip
+it with --no-baseline.
+
+Under a software rasterizer such as llvmpipe the culling pass and the draws
+run on the CPU as well, so both culled paths cost about the same there; the
+difference is meant for hardware GPUs, where the "gpu" path submits in
+constant time.
+"""
+import argparse
+import sys
+from pathlib import Path
+from time import perf_counter
+
+import moderngl
+import numpy as np
+import pyrr
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from learn_opengl import (  # noqa: E402
+    culling, geometry, gpu_culling, headless, programs, textures, transforms, uniforms,
+)
+from learn_opengl.stats import summarize  # noqa: E402
+from bench_mipmaps import CUBE  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cubes", type=int, default=1_000_000)
+    parser.add_argument("--extent", type=float, default=100.0, help="cubes lie in [-extent, extent]^3")
+    parser.add_argument("--size", type=headless.parse_size, default=(640, 360), help="WIDTHxHEIGHT")
+    parser.add_argument("--frames", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--no-baseline", action="store_true", help="skip drawing every cube unculled")
+    parser.add_argument("--backend", default="egl", help='glcontext backend, "" for the platform default')
+    args = parser.parse_args()
+
+    kwargs = {"backend": args.backend} if args.backend else {}
+    ctx = moderngl.create_standalone_context(**kwargs)
+    ctx.enable(moderngl.DEPTH_TEST)
+    fbo = ctx.simple_framebuffer(args.size)
+    fbo.use()
+
+    width, height = args.size
+    projection = pyrr.matrix44.create_perspective_projection(
+        fovy=45.0, aspect=width / height, near=0.1, far=100.0, dtype=np.float32
+    )
+    prog = programs.registry(ctx).load("textured_cube", defines={"INSTANCED": 1})
+    camera_block = uniforms.camera_block(ctx)
+    camera_block.update(projection=projection)
+    textures.load_texture(ctx, ROOT / "textures" / "container.png").use(location=0)
+
+    rng = np.random.default_rng(1337)
+    positions = rng.uniform(-args.extent, args.extent, size=(args.cubes, 3)).astype(np.float32)
+    models = transforms.from_eulers(positions, rng.random((args.cubes, 3)) * np.pi)
+    mesh = geometry.index_mesh(CUBE, "3f 2f")
+
+    all_models = ctx.buffer(models)
+    cpu_models = ctx.buffer(reserve=models.nbytes, dynamic=True)
+    culler = gpu_culling.GpuCuller(ctx, all_models, args.cubes, mesh.radius, len(mesh.indices))
+    eye = np.array([0.0, 0.0, 3.0], dtype=np.float32)
+    up = np.array([0.0, 1.0, 0.0], dtype=np.float32)
+
+    def view(frame):
+        yaw = np.deg2rad(frame * 7.0)
+        front = np.array([np.sin(yaw), 0.0, -np.cos(yaw)], dtype=np.float32)
+        return pyrr.matrix44.create_look_at(eye=eye, target=eye + front, up=up, dtype=np.float32)
+
+    def draw_all(vao, view):
+        vao.render(moderngl.TRIANGLES, instances=args.cubes)
+        return args.cubes
+
+    def draw_cpu(vao, view):
+        visible = models[culling.spheres_visible(culling.frustum_planes(view, projection), positions, mesh.radius)]
+        cpu_models.write(visible)
+        vao.render(moderngl.TRIANGLES, instances=len(visible))
+        return len(visible)
+
+    def draw_gpu(vao, view):
+        culler.cull(view, projection)
+        culler.render(vao)
+        return None
+
+    paths = [
+        ("cpu", cpu_models, draw_cpu),
+        ("gpu", culler.visible, draw_gpu),
+    ]
+    if not args.no_baseline:
+        paths.insert(0, ("none", all_models, draw_all))
+
+    print(f"{args.cubes} cubes, {width}x{height}, {ctx.info['GL_RENDERER']}")
+    for label, instances, draw in paths:
+        vao = mesh.vertex_array(ctx, prog, "position", "in_texture_coords", instances=[(instances, "16f/i", "model")])
+        submit_times, frame_times, drawn = [], [], []
+        for frame in range(args.warmup + args.frames):
+            current = view(frame)
+            start = perf_counter()
+            fbo.clear(0.0, 0.0, 0.0, 1.0)
+            camera_block.update(view=current)
+            count = draw(vao, current)
+            submitted = perf_counter()
+            ctx.finish()
+            if frame >= args.warmup:
+                submit_times.append(submitted - start)
+                frame_times.append(perf_counter() - start)
+                drawn.append(culler.visible_count() if count is None else count)
+        submit, total = summarize(submit_times), summarize(frame_times)
+        print(
+            f"{label:<5} submit p50 {submit['p50']:8.3f}ms  frame p50 {total['p50']:8.3f}ms"
+            f"  p95 {total['p95']:8.3f}ms  drawn {np.mean(drawn):>9.0f}"
+        )
+        vao.release()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""Fill-rate benchmark: a dense, far-away textured cube field with and without mipmaps.
+
+Every cube covers a handful of pixels, so without mipmaps each fragment samples
+the full-resolution level far apart from its neighbours' samples (aliasing and
+poor texture-cache locality); with mipmaps it reads a level of about its own size.
+
+    python benchmarks/bench_mipmaps.py
+    python benchmarks/bench_mipmaps.py --cubes 50000 --texture-size 2048 --size 1920x1080
+"""
+import argparse
+import sys
+from pathlib import Path
+from time import perf_counter
+
+import moderngl
+import numpy as np
+import pyrr
+from PIL import Image
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from learn_opengl import headless, programs, textures, transforms, uniforms  # noqa: E402
+from learn_opengl.stats import summarize  # noqa: E402
+
+# fmt: off
+CUBE = np.array([
+    # positions        # texture coords
+    -0.5, -0.5, -0.5,  0.0, 0.0,   0.5, -0.5, -0.5,  1.0, 0.0,   0.5,  0.5, -0.5,  1.0, 1.0,
+     0.5,  0.5, -0.5,  1.0, 1.0,  -0.5,  0.5, -0.5,  0.0, 1.0,  -0.5, -0.5, -0.5,  0.0, 0.0,
+    -0.5, -0.5,  0.5,  0.0, 0.0,   0.5, -0.5,  0.5,  1.0, 0.0,   0.5,  0.5,  0.5,  1.0, 1.0,
+     0.5,  0.5,  0.5,  1.0, 1.0,  -0.5,  0.5,  0.5,  0.0, 1.0,  -0.5, -0.5,  0.5,  0.0, 0.0,
+    -0.5,  0.5,  0.5,  1.0, 0.0,  -0.5,  0.5, -0.5,  1.0, 1.0,  -0.5, -0.5, -0.5,  0.0, 1.0,
+    -0.5, -0.5, -0.5,  0.0, 1.0,  -0.5, -0.5,  0.5,  0.0, 0.0,  -0.5,  0.5,  0.5,  1.0, 0.0,
+     0.5,  0.5,  0.5,  1.0, 0.0,   0.5,  0.5, -0.5,  1.0, 1.0,   0.5, -0.5, -0.5,  0.0, 1.0,
+     0.5, -0.5, -0.5,  0.0, 1.0,   0.5, -0.5,  0.5,  0.0, 0.0,   0.5,  0.5,  0.5,  1.0, 0.0,
+    -0.5, -0.5, -0.5,  0.0, 1.0,   0.5, -0.5, -0.5,  1.0, 1.0,   0.5, -0.5,  0.5,  1.0, 0.0,
+     0.5, -0.5,  0.5,  1.0, 0.0,  -0.5, -0.5,  0.5,  0.0, 0.0,  -0.5, -0.5, -0.5,  0.0, 1.0,
+    -0.5,  0.5, -0.5,  0.0, 1.0,   0.5,  0.5, -0.5,  1.0, 1.0,   0.5,  0.5,  0.5,  1.0, 0.0,
+     0.5,  0.5,  0.5,  1.0, 0.0,  -0.5,  0.5,  0.5,  0.0, 0.0,  -0.5,  0.5, -0.5,  0.0, 1.0,
+], dtype=np.float32)
+# fmt: on
+
+
+def make_texture(ctx, path, texture_size, mipmap, anisotropy):
+    pixels = textures.load_pixels(path)
+    if texture_size:
+        pixels = np.asarray(Image.fromarray(np.asarray(pixels)).resize((texture_size, texture_size)))
+    height, width = pixels.shape[:2]
+    texture = ctx.texture((width, height), components=4, data=pixels)
+    textures.apply_sampling(texture, mipmap=mipmap, anisotropy=anisotropy)
+    return texture
+
+
+def run(ctx, fbo, vao, texture, cubes, frames, warmup):
+    texture.use(location=0)
+    times = []
+    for _ in range(warmup + frames):
+        start = perf_counter()
+        fbo.use()
+        fbo.clear(0.0, 0.0, 0.0, 1.0)
+        vao.render(moderngl.TRIANGLES, instances=cubes)
+        ctx.finish()
+        times.append(perf_counter() - start)
+    return summarize(times[warmup:])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cubes", type=int, default=20_000)
+    parser.add_argument("--distance", type=float, default=60.0, help="mean distance of the cube field")
+    parser.add_argument("--texture", type=Path, default=ROOT / "textures" / "container.png")
+    parser.add_argument("--texture-size", type=int, default=1024, help="resample the texture, 0 keeps it")
+    parser.add_argument("--anisotropy", type=float, default=8.0)
+    parser.add_argument("--size", type=headless.parse_size, default=(1280, 720), help="WIDTHxHEIGHT")
+    parser.add_argument("--frames", type=int, default=30)
+    parser.add_argument("--warmup", type=int, default=5)
+    parser.add_argument("--backend", default="egl", help='glcontext backend, "" for the platform default')
+    args = parser.parse_args()
+
+    kwargs = {"backend": args.backend} if args.backend else {}
+    ctx = moderngl.create_standalone_context(**kwargs)
+    ctx.enable(moderngl.DEPTH_TEST)
+    fbo = ctx.simple_framebuffer(args.size)
+
+    prog = programs.registry(ctx).load("textured_cube", defines={"INSTANCED": 1})
+    width, height = args.size
+    uniforms.camera_block(ctx).update(
+        view=pyrr.matrix44.create_identity(dtype=np.float32),
+        projection=pyrr.matrix44.create_perspective_projection(
+            fovy=45.0, aspect=width / height, near=0.1, far=args.distance * 3, dtype=np.float32
+        ),
+    )
+
+    # a wall of small cubes filling the view at ``distance``
+    rng = np.random.default_rng(1337)
+    half_height = np.tan(np.deg2rad(22.5)) * args.distance
+    positions = np.column_stack(
+        [
+            rng.uniform(-1.0, 1.0, args.cubes) * half_height * width / height,
+            rng.uniform(-1.0, 1.0, args.cubes) * half_height,
+            -args.distance + rng.uniform(-0.25, 0.25, args.cubes) * args.distance,
+        ]
+    )
+    models = transforms.from_eulers(positions, rng.random((args.cubes, 3)) * np.pi)
+    vao = ctx.vertex_array(
+        prog,
+        [
+            (ctx.buffer(CUBE), "3f 2f", "position", "in_texture_coords"),
+            (ctx.buffer(models), "16f/i", "model"),
+        ],
+    )
+
+    print(f"{args.cubes} cubes at ~{args.distance:g} units, {width}x{height}, {ctx.info['GL_RENDERER']}")
+    for label, mipmap, anisotropy in (
+        ("no mipmaps", False, 1.0),
+        ("mipmaps", True, 1.0),
+        (f"mipmaps + {args.anisotropy:g}x aniso", True, args.anisotropy),
+    ):
+        texture = make_texture(ctx, args.texture, args.texture_size, mipmap, anisotropy)
+        stats = run(ctx, fbo, vao, texture, args.cubes, args.frames, args.warmup)
+        print(f"{label:<24} p50 {stats['p50']:8.3f}ms  p95 {stats['p95']:8.3f}ms")
+        texture.release()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""Readback benchmark: render an animated cube field and read every frame back.
+
+Compares frame throughput without readback, with a blocking ``fbo.read()`` per
+frame and with :class:`~learn_opengl.readback.AsyncReadback` at double and
+triple buffering. The blocking read waits for each frame to finish before the
+next one is submitted; the pack-buffer ring only waits for frames submitted
+``depth - 1`` frames earlier. On a software rasterizer such as llvmpipe the
+"GPU" work happens inside the draw and finish calls on the CPU, so there is
+nothing to overlap and all four rows come out about the same.
+
+A second table times getting one frame into a top-row-first NumPy array:
+through ``fbo.read()`` bytes and ``Image.frombytes`` as lesson 001 used to,
+through ``np.frombuffer`` plus a flipped copy, and with ``read_pixels`` into a
+preallocated array, which returns a flipped view.
+
+    python benchmarks/bench_readback.py
+    python benchmarks/bench_readback.py --cubes 20000 --size 1920x1080 --frames 120
+    python benchmarks/bench_readback.py --size 3840x2160  # 4K frames to NumPy
+"""
+import argparse
+import sys
+from pathlib import Path
+from time import perf_counter
+
+import moderngl
+import numpy as np
+import pyrr
+from PIL import Image
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from bench_mipmaps import CUBE  # noqa: E402
+
+from learn_opengl import headless, programs, textures, transforms, uniforms  # noqa: E402
+from learn_opengl.readback import AsyncReadback, pixel_array, read_pixels  # noqa: E402
+from learn_opengl.stats import summarize  # noqa: E402
+
+
+def run(fbo, vao, models, eulers, cubes, frames, read):
+    """Frames per second over ``frames`` frames; ``read(fbo)`` is called after each one."""
+    start = perf_counter()
+    for frame in range(frames):
+        models.write(transforms.from_eulers(eulers[0], eulers[1] * frame * 0.01))
+        fbo.use()
+        fbo.clear(0.1, 0.2, 0.3, 1.0)
+        vao.render(moderngl.TRIANGLES, instances=cubes)
+        read(fbo)
+    return frames / (perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cubes", type=int, default=500)
+    parser.add_argument("--size", type=headless.parse_size, default=(1280, 720), help="WIDTHxHEIGHT")
+    parser.add_argument("--frames", type=int, default=60)
+    parser.add_argument("--backend", default="egl", help='glcontext backend, "" for the platform default')
+    args = parser.parse_args()
+
+    kwargs = {"backend": args.backend} if args.backend else {}
+    ctx = moderngl.create_standalone_context(**kwargs)
+    ctx.enable(moderngl.DEPTH_TEST)
+    fbo = ctx.simple_framebuffer(args.size)
+
+    prog = programs.registry(ctx).load("textured_cube", defines={"INSTANCED": 1})
+    width, height = args.size
+    uniforms.camera_block(ctx).update(
+        view=pyrr.matrix44.create_identity(dtype=np.float32),
+        projection=pyrr.matrix44.create_perspective_projection(
+            fovy=45.0, aspect=width / height, near=0.1, far=100.0, dtype=np.float32
+        ),
+    )
+    textures.load_texture(ctx, ROOT / "textures" / "container.png").use(location=0)
+
+    rng = np.random.default_rng(1337)
+    positions = rng.uniform((-20.0, -12.0, -60.0), (20.0, 12.0, -30.0), (args.cubes, 3))
+    spins = rng.uniform(-1.0, 1.0, (args.cubes, 3))
+    eulers = np.stack([positions, spins])
+    models = ctx.buffer(reserve=args.cubes * 64, dynamic=True)
+    vao = ctx.vertex_array(
+        prog,
+        [
+            (ctx.buffer(CUBE), "3f 2f", "position", "in_texture_coords"),
+            (models, "16f/i", "model"),
+        ],
+    )
+
+    def no_read(fbo):
+        ctx.finish()
+
+    def blocking(fbo):
+        fbo.read(components=4)
+
+    def async_read(depth):
+        readback = AsyncReadback(ctx, fbo.size, depth=depth)
+        out = np.empty(readback.shape, dtype=np.uint8)
+        return lambda fbo: readback.push(fbo, out)
+
+    print(f"{args.cubes} cubes, {width}x{height}, {ctx.info['GL_RENDERER']}")
+    for label, read in (
+        ("no readback", no_read),
+        ("fbo.read()", blocking),
+        ("async, 2 buffers", async_read(2)),
+        ("async, 3 buffers", async_read(3)),
+    ):
+        fps = run(fbo, vao, models, eulers, args.cubes, args.frames, read)
+        print(f"{label:<20} {fps:8.1f} fps")
+
+    rgb = pixel_array(fbo.size, components=3)
+    rgba = pixel_array(fbo.size, components=4)
+    print("one frame to a top-row-first array")
+    for label, read in (
+        ("Image.frombytes", lambda: np.asarray(Image.frombytes("RGB", fbo.size, fbo.read(), "raw", "RGB", 0, -1))),
+        ("np.frombuffer+copy", lambda: np.frombuffer(fbo.read(), np.uint8).reshape(height, width, 3)[::-1].copy()),
+        ("read_pixels RGB", lambda: read_pixels(fbo, rgb)),
+        ("read_pixels RGBA", lambda: read_pixels(fbo, rgba)),
+    ):
+        times = []
+        for _ in range(args.frames):
+            start = perf_counter()
+            read()
+            times.append(perf_counter() - start)
+        stats = summarize(times)
+        print(f"{label:<20} p50 {stats['p50']:8.3f}ms  p95 {stats['p95']:8.3f}ms")
+
+
+if __name__ == "__main__":
+    main()
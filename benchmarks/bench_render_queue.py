@@ -0,0 +1,107 @@
+"""Render queue benchmark: a scene mixing programs, meshes and textures, drawn in loop order and sorted.
+
+    python benchmarks/bench_render_queue.py
+    python benchmarks/bench_render_queue.py --objects 20000 --frames 20
+
+Every object is one of three kinds: a cube or a plane drawn with the
+``textured_cube`` program, or a screen space quad drawn with the program of
+``015-rotation-texture-animation-multiple-planes.py``; each gets one of three
+textures. The objects are submitted to a learn_opengl.render_queue.RenderQueue
+in scene order and flushed as submitted ("loop order") or sorted by
+(program, texture, vertex array, depth). Each row reports the program,
+texture, vertex array and uniform switches of a frame, the CPU time spent
+submitting and flushing, and the frame time including ``ctx.finish()``.
+"""
+import argparse
+import runpy
+import sys
+from pathlib import Path
+from time import perf_counter
+
+import moderngl
+import numpy as np
+import pyrr
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from bench_mipmaps import CUBE  # noqa: E402
+
+from learn_opengl import geometry, headless, programs, textures, transforms, uniforms  # noqa: E402
+from learn_opengl.render_queue import RenderQueue  # noqa: E402
+from learn_opengl.stats import summarize  # noqa: E402
+
+MATERIALS = [ROOT / "textures" / name for name in ("face.png", "container.png", "container_specular.png")]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--objects", type=int, default=3000)
+    parser.add_argument("--size", type=headless.parse_size, default=(640, 360), help="WIDTHxHEIGHT")
+    parser.add_argument("--frames", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--backend", default="egl", help='glcontext backend, "" for the platform default')
+    args = parser.parse_args()
+
+    kwargs = {"backend": args.backend} if args.backend else {}
+    ctx = moderngl.create_standalone_context(**kwargs)
+    ctx.enable(moderngl.DEPTH_TEST)
+    fbo = ctx.simple_framebuffer(args.size)
+    fbo.use()
+
+    width, height = args.size
+    uniforms.camera_block(ctx).update(
+        view=pyrr.matrix44.create_identity(dtype=np.float32),
+        projection=pyrr.matrix44.create_perspective_projection(
+            fovy=45.0, aspect=width / height, near=0.1, far=100.0, dtype=np.float32
+        ),
+    )
+    materials = [textures.load_texture(ctx, path) for path in MATERIALS]
+
+    lesson = runpy.run_path(str(ROOT / "015-rotation-texture-animation-multiple-planes.py"))
+    cube_prog = programs.registry(ctx).load("textured_cube")
+    quad_prog = ctx.program(vertex_shader=lesson["VERTEX_SHADER"], fragment_shader=lesson["FRAGMENT_SHADER"])
+    plane = ctx.buffer(lesson["VERTICES"])
+    kinds = [
+        (geometry.index_mesh(CUBE, "3f 2f").vertex_array(ctx, cube_prog, "position", "in_texture_coords"), "model"),
+        (ctx.vertex_array(cube_prog, plane, "position", "in_texture_coords", mode=moderngl.TRIANGLE_FAN), "model"),
+        (ctx.vertex_array(quad_prog, plane, "position", "in_texture_coords", mode=moderngl.TRIANGLE_FAN), "transform"),
+    ]
+
+    rng = np.random.default_rng(1337)
+    kind = rng.integers(len(kinds), size=args.objects)
+    material = rng.integers(len(materials), size=args.objects)
+    positions = rng.uniform((-20.0, -12.0, -60.0), (20.0, 12.0, -30.0), (args.objects, 3))
+    models = transforms.from_axis_rotations(positions, rng.uniform(-1.0, 1.0, (args.objects, 3)), 0.5)
+    # the quads live in clip space: shrink them and keep them in front of the 3D objects' depth range
+    quads = kind == 2
+    models[quads] = pyrr.matrix44.create_from_scale((0.05, 0.05, 1.0), dtype=np.float32)
+    models[quads, 3, :2] = rng.uniform(-1.0, 1.0, (quads.sum(), 2))
+    models[quads, 3, 2] = -0.5
+    depths = np.linalg.norm(positions, axis=1)
+
+    print(f"{args.objects} objects, {width}x{height}, {ctx.info['GL_RENDERER']}")
+    print(f"{'':<12}{'programs':>9}{'textures':>9}{'vaos':>7}{'uniforms':>9}{'submit ms':>11}{'frame ms':>10}")
+    for label, queue in (("loop order", RenderQueue(sort=False)), ("sorted", RenderQueue())):
+        submit, frame = [], []
+        for index in range(args.warmup + args.frames):
+            start = perf_counter()
+            fbo.clear(0.1, 0.2, 0.3, 1.0)
+            for object_kind, texture, model, depth in zip(kind, material, models, depths):
+                vao, uniform = kinds[object_kind]
+                queue.submit(vao, textures=[materials[texture]], uniforms={uniform: model}, depth=depth)
+            queue.flush()
+            submitted = perf_counter()
+            ctx.finish()
+            if index >= args.warmup:
+                submit.append(submitted - start)
+                frame.append(perf_counter() - start)
+        changes = queue.changes
+        print(
+            f"{label:<12}{changes.programs:>9}{changes.textures:>9}{changes.vertex_arrays:>7}{changes.uniforms:>9}"
+            f"{summarize(submit)['p50']:>11.2f}{summarize(frame)['p50']:>10.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
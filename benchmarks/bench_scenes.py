@@ -0,0 +1,118 @@
+"""Frame-time benchmark over the lesson scenes.
+
+Every scene is run offscreen (see ``learn_opengl.headless``) for a number of
+warm-up frames that are thrown away, followed by the measured frames. The
+per-frame times are summarized (p50/p95/p99, mean, variance, in milliseconds)
+and written as JSON, optionally along with the GPU time of the draw calls
+(``--gpu-timing``, see ``learn_opengl.gpu_timer``). A run can be kept as a
+baseline and compared later:
+
+    python benchmarks/bench_scenes.py --output baseline.json
+    python benchmarks/bench_scenes.py --compare baseline.json --threshold 0.15
+"""
+import argparse
+import json
+import platform
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from learn_opengl import headless  # noqa: E402
+from learn_opengl.stats import summarize  # noqa: E402
+
+SCENES = {
+    "triangle": "003-hello-triangle.py",
+    "textured-quad": "010-texture-quad_fs.py",
+    "cube": "020-cube-textures-z-buffer.py",
+    "cube-field": "021-cube-textures-more-cubes.py",
+    "cube-field-eulers": "023-cube-textures-more-cubes-eulers-rand-rot.py",
+    "camera-view": "024-camera-view.py",
+    "camera-look-around": "025-look-around-camera.py",
+    "camera-walk-mouse": "028-walk-around-camera-controls-mouse.py",
+}
+
+
+def run_scene(path, frames, warmup, size, backend, gpu_timing=False):
+    run = headless.run_lesson(path, frames=warmup + frames, size=size, backend=backend, gpu_timing=gpu_timing)
+    gpu_time = {name: summarize(samples[warmup:]) for name, samples in run.gpu_times.items()}
+    return run, summarize(run.frame_times[warmup:]), gpu_time
+
+
+def compare(results, baseline, threshold):
+    """Names of the scenes whose p95 frame time grew by more than ``threshold``."""
+    regressions = []
+    for name, result in results["scenes"].items():
+        before = baseline["scenes"].get(name)
+        if before is None:
+            continue
+        ratio = result["frame_time_ms"]["p95"] / before["frame_time_ms"]["p95"]
+        print(f"{name:<20} p95 {before['frame_time_ms']['p95']:8.3f}ms -> {result['frame_time_ms']['p95']:8.3f}ms ({ratio - 1:+.1%})")
+        if ratio > 1.0 + threshold:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("scenes", nargs="*", help=f"scenes to run, all by default: {', '.join(SCENES)}")
+    parser.add_argument("--all-lessons", action="store_true", help="benchmark every lesson instead of the scene list")
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--warmup", type=int, default=30)
+    parser.add_argument("--size", type=headless.parse_size, default=(1280, 720), help="WIDTHxHEIGHT")
+    parser.add_argument("--backend", default="egl", help='glcontext backend, "" for the platform default')
+    parser.add_argument("--gpu-timing", action="store_true", help="also record GPU time spent in draw calls")
+    parser.add_argument("--output", type=Path, help="write the results to this JSON file")
+    parser.add_argument("--compare", type=Path, help="baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="allowed relative p95 growth")
+    args = parser.parse_args()
+    unknown = set(args.scenes) - set(SCENES)
+    if unknown:
+        parser.error(f"unknown scenes: {', '.join(sorted(unknown))}")
+
+    root = Path(__file__).resolve().parent.parent
+    if args.all_lessons:
+        scenes = {path.stem: path for path in headless.lesson_paths(root)}
+    else:
+        scenes = {name: root / SCENES[name] for name in (args.scenes or SCENES)}
+
+    results = {
+        "created": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "size": list(args.size),
+        "frames": args.frames,
+        "warmup": args.warmup,
+        "scenes": {},
+    }
+    for name, path in scenes.items():
+        run, frame_time, gpu_time = run_scene(
+            path, args.frames, args.warmup, args.size, args.backend or None, args.gpu_timing
+        )
+        if not frame_time["count"]:
+            # 001 renders a single frame into its own context, nothing to time
+            print(f"{name:<20} no frames recorded, skipped")
+            continue
+        results.setdefault("renderer", run.renderer)
+        results["scenes"][name] = {"lesson": path.name, "frame_time_ms": frame_time}
+        if args.gpu_timing:
+            results["scenes"][name]["gpu_time_ms"] = gpu_time
+        print(
+            f"{name:<20} p50 {frame_time['p50']:8.3f}ms  p95 {frame_time['p95']:8.3f}ms"
+            f"  p99 {frame_time['p99']:8.3f}ms  var {frame_time['variance']:8.3f}ms^2"
+        )
+        for pass_name, pass_time in gpu_time.items():
+            print(f"{'':<20} GPU {pass_name} p50 {pass_time['p50']:8.3f}ms  p95 {pass_time['p95']:8.3f}ms")
+
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2))
+    if args.compare:
+        regressions = compare(results, json.loads(args.compare.read_text()), args.threshold)
+        if regressions:
+            print("frame-time regressions:", ", ".join(regressions))
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""Static batching benchmark: a field of cubes that never move, drawn one by one and as one static batch.
+
+    python benchmarks/bench_static_batch.py
+    python benchmarks/bench_static_batch.py --cubes 50000 --frames 20
+
+"per object" sets the model matrix, binds the cube's texture and issues a draw
+for every cube, as the non-instanced lessons do; "static batch" draws the
+pre-transformed learn_opengl.static_batch.StaticBatch with one call and the
+texture array bound once. "submit" is the CPU time spent issuing the frame,
+"frame" includes waiting for it to finish.
+
+A second table times the batch updates: adding one cube, removing one (the
+last cube moves into its place) and, for comparison, building the whole batch
+from scratch as a non-incremental version would on every change.
+"""
+import argparse
+import sys
+from pathlib import Path
+from time import perf_counter
+
+import moderngl
+import numpy as np
+import pyrr
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from bench_mipmaps import CUBE  # noqa: E402
+
+from learn_opengl import geometry, headless, programs, textures, transforms, uniforms  # noqa: E402
+from learn_opengl.static_batch import StaticBatch  # noqa: E402
+from learn_opengl.stats import summarize  # noqa: E402
+
+MATERIALS = [ROOT / "textures" / name for name in ("face.png", "container.png", "container_specular.png")]
+
+
+def timed(function, repeat):
+    """``summarize`` of ``repeat`` calls of ``function``."""
+    times = []
+    for _ in range(repeat):
+        start = perf_counter()
+        function()
+        times.append(perf_counter() - start)
+    return summarize(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cubes", type=int, default=10_000)
+    parser.add_argument("--size", type=headless.parse_size, default=(640, 360), help="WIDTHxHEIGHT")
+    parser.add_argument("--frames", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--backend", default="egl", help='glcontext backend, "" for the platform default')
+    args = parser.parse_args()
+
+    kwargs = {"backend": args.backend} if args.backend else {}
+    ctx = moderngl.create_standalone_context(**kwargs)
+    ctx.enable(moderngl.DEPTH_TEST)
+    fbo = ctx.simple_framebuffer(args.size)
+    fbo.use()
+
+    width, height = args.size
+    uniforms.camera_block(ctx).update(
+        view=pyrr.matrix44.create_identity(dtype=np.float32),
+        projection=pyrr.matrix44.create_perspective_projection(
+            fovy=45.0, aspect=width / height, near=0.1, far=100.0, dtype=np.float32
+        ),
+    )
+    rng = np.random.default_rng(1337)
+    positions = rng.uniform((-20.0, -12.0, -60.0), (20.0, 12.0, -30.0), (args.cubes, 3))
+    axes = rng.uniform(-1.0, 1.0, (args.cubes, 3))
+    models = transforms.from_axis_rotations(positions, axes, rng.uniform(0.0, np.pi, args.cubes))
+    layers = np.arange(args.cubes) % len(MATERIALS)
+    mesh = geometry.index_mesh(CUBE, "3f 2f").quantized("3f2 x2 2f2")
+
+    prog = programs.registry(ctx).load("textured_cube")
+    materials = [textures.load_texture(ctx, path) for path in MATERIALS]
+    vao = mesh.vertex_array(ctx, prog, "position", "in_texture_coords")
+
+    batch_prog = programs.registry(ctx).load("textured_cube", defines={"TEXTURE_ARRAY": 1})
+    batch_prog["model"] = pyrr.matrix44.create_identity(dtype=np.float32).flatten()
+    texture_array = textures.load_texture_array(ctx, MATERIALS)
+    batch = StaticBatch(ctx, batch_prog)
+    batch.extend(mesh, models, layers)
+
+    def per_object():
+        for model, layer in zip(models, layers):
+            prog["model"] = model.flatten()
+            materials[layer].use(location=0)
+            vao.render(moderngl.TRIANGLES)
+
+    def batched():
+        texture_array.use(location=0)
+        batch.render()
+
+    print(f"{args.cubes} static cubes, {width}x{height}, {ctx.info['GL_RENDERER']}")
+    for label, draw in (("per object", per_object), ("static batch", batched)):
+        submit, frame = [], []
+        for index in range(args.warmup + args.frames):
+            start = perf_counter()
+            fbo.clear(0.1, 0.2, 0.3, 1.0)
+            draw()
+            submitted = perf_counter()
+            ctx.finish()
+            if index >= args.warmup:
+                submit.append(submitted - start)
+                frame.append(perf_counter() - start)
+        submit, frame = summarize(submit), summarize(frame)
+        print(
+            f"{label:<14} submit p50 {submit['p50']:8.3f}ms  "
+            f"frame p50 {frame['p50']:8.3f}ms  p95 {frame['p95']:8.3f}ms"
+        )
+
+    def rebuild():
+        fresh = StaticBatch(ctx, batch_prog)
+        fresh.extend(mesh, models, layers)
+        fresh.release()
+
+    # removed from the front of the batch, the last cube moves into their place
+    handles = iter(sorted(batch.entries))
+    print("batch updates")
+    for label, update, repeat in (
+        ("add one", lambda: batch.add(mesh, models[0], layers[0]), args.frames),
+        ("remove one", lambda: batch.remove(next(handles)), args.frames),
+        ("full rebuild", rebuild, 3),
+    ):
+        stats = timed(update, repeat)
+        print(f"{label:<14} p50 {stats['p50']:8.3f}ms  p95 {stats['p95']:8.3f}ms")
+
+
+if __name__ == "__main__":
+    main()
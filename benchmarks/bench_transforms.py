@@ -0,0 +1,91 @@
+"""Microbenchmark: per-object pyrr loop vs. learn_opengl.transforms batch kernels.
+
+    python benchmarks/bench_transforms.py
+    python benchmarks/bench_transforms.py --sizes 10 1000 --min-time 0.5
+
+The pyrr loop alone takes a couple of minutes at N = 1M.
+"""
+import argparse
+import sys
+from pathlib import Path
+from time import perf_counter
+
+import numpy as np
+import pyrr
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from learn_opengl import transforms  # noqa: E402
+
+
+def pyrr_axis_loop(positions, axes, theta, out):
+    # the per-cube body of 021-cube-textures-more-cubes.py
+    for idx, (position, axis) in enumerate(zip(positions, axes)):
+        model_rot = pyrr.matrix44.create_from_axis_rotation(axis=axis, theta=theta, dtype=np.float32)
+        out[idx] = model_rot.dot(pyrr.matrix44.create_from_translation(position))
+    return out
+
+
+def pyrr_euler_loop(positions, eulers, time, out):
+    # the per-cube body of 023-cube-textures-more-cubes-eulers-rand-rot.py
+    for idx, (position, rot) in enumerate(zip(positions, eulers)):
+        model = pyrr.matrix44.create_identity(dtype=np.float32)
+        model = model.dot(pyrr.matrix44.create_from_eulers(rot * time, dtype=np.float32))
+        out[idx] = model.dot(pyrr.matrix44.create_from_translation(pyrr.Vector3(position)))
+    return out
+
+
+def measure(fn, min_time):
+    """Best-of wall time per call, repeating until ``min_time`` seconds are spent."""
+    best = float("inf")
+    spent = 0.0
+    while spent < min_time:
+        start = perf_counter()
+        fn()
+        elapsed = perf_counter() - start
+        best = min(best, elapsed)
+        spent += elapsed
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 1_000, 100_000, 1_000_000])
+    parser.add_argument("--min-time", type=float, default=0.2, help="seconds spent per measurement")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(1337)
+    theta = np.deg2rad(50 * 1.5)
+    time = 1.5
+
+    print(f"{'kernel':<8} {'N':>9} {'pyrr loop':>12} {'batch':>12} {'speedup':>9}")
+    for count in args.sizes:
+        positions = rng.uniform(-20.0, 20.0, size=(count, 3)).astype(np.float32)
+        axes = rng.random(size=(count, 3)).astype(np.float32) + 0.1
+        out = transforms.empty_models(count)
+        reference = transforms.empty_models(count)
+
+        for name, loop, batch in (
+            (
+                "axis",
+                lambda: pyrr_axis_loop(positions, axes, theta, reference),
+                lambda: transforms.from_axis_rotations(positions, axes, theta, out=out),
+            ),
+            (
+                "euler",
+                lambda: pyrr_euler_loop(positions, axes, time, reference),
+                lambda: transforms.from_eulers(positions, axes, time, out=out),
+            ),
+        ):
+            loop_time = measure(loop, args.min_time)
+            batch_time = measure(batch, args.min_time)
+            if not np.allclose(out, reference, atol=1e-5):
+                raise AssertionError(f"{name} kernel does not match pyrr at N={count}")
+            print(
+                f"{name:<8} {count:>9} {loop_time * 1e3:>10.3f}ms {batch_time * 1e3:>10.3f}ms"
+                f" {loop_time / batch_time:>8.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    main()
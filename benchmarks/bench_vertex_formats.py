@@ -0,0 +1,109 @@
+"""Vertex fetch benchmark: one large indexed mesh drawn from float32 and packed vertex layouts.
+
+    python benchmarks/bench_vertex_formats.py
+    python benchmarks/bench_vertex_formats.py --segments 2048 --size 128x128 --frames 50
+
+The mesh is a UV sphere of ``segments x segments`` quads, about ``segments ** 2``
+unique vertices of position and texture coordinates, quantized with
+learn_opengl.geometry.quantize into each layout. The framebuffer is kept small
+so that vertex fetch and shading, not rasterization, dominate a draw. Each row
+reports the bytes per vertex, the vertex buffer size, the draw time (including
+``ctx.finish()``), the vertex data read per second and the largest position
+and texture coordinate error the layout introduces.
+
+Under llvmpipe, with 263k vertices at 256x256, the 12 byte layouts draw in
+about 140 ms against 200 ms for ``"3f 2f"``; the half float positions are off
+by at most 2.4e-4 on the unit sphere.
+"""
+import argparse
+import sys
+from pathlib import Path
+from time import perf_counter
+
+import moderngl
+import numpy as np
+import pyrr
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from learn_opengl import geometry, headless, programs, textures, uniforms  # noqa: E402
+from learn_opengl.stats import summarize  # noqa: E402
+
+#: Layouts compared, all holding a position and texture coordinates
+FORMATS = (
+    "3f 2f",
+    "3f 2f2",
+    "3f2 x2 2f2",
+    "3f2 x2 2f1 x2",
+)
+
+
+def sphere(segments: int) -> geometry.Mesh:
+    """Indexed UV sphere of radius 1 as ``"3f 2f"`` float rows."""
+    u, v = np.meshgrid(np.linspace(0.0, 1.0, segments + 1), np.linspace(0.0, 1.0, segments + 1))
+    theta, phi = u * 2.0 * np.pi, v * np.pi
+    vertices = np.stack(
+        [np.sin(phi) * np.cos(theta), np.cos(phi), np.sin(phi) * np.sin(theta), u, v], axis=-1
+    ).reshape(-1, 5)
+    corner = (np.arange(segments)[:, None] * (segments + 1) + np.arange(segments)[None, :]).reshape(-1, 1)
+    quads = corner + np.array([0, 1, segments + 2, segments + 2, segments + 1, 0])
+    indices = quads.reshape(-1).astype(geometry.index_dtype(len(vertices)))
+    return geometry.Mesh(vertices=vertices.astype(np.float32), indices=indices, fmt="3f 2f")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--segments", type=int, default=1024, help="quads along each side of the sphere grid")
+    parser.add_argument("--size", type=headless.parse_size, default=(256, 256), help="WIDTHxHEIGHT")
+    parser.add_argument("--frames", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--backend", default="egl", help='glcontext backend, "" for the platform default')
+    args = parser.parse_args()
+
+    kwargs = {"backend": args.backend} if args.backend else {}
+    ctx = moderngl.create_standalone_context(**kwargs)
+    ctx.enable(moderngl.DEPTH_TEST)
+    fbo = ctx.simple_framebuffer(args.size)
+    fbo.use()
+
+    width, height = args.size
+    prog = programs.registry(ctx).load("textured_cube")
+    prog["model"] = pyrr.matrix44.create_identity(dtype=np.float32).flatten()
+    uniforms.camera_block(ctx).update(
+        view=pyrr.matrix44.create_from_translation((0.0, 0.0, -3.0), dtype=np.float32),
+        projection=pyrr.matrix44.create_perspective_projection(
+            fovy=45.0, aspect=width / height, near=0.1, far=100.0, dtype=np.float32
+        ),
+    )
+    textures.load_texture(ctx, ROOT / "textures" / "container.png").use(location=0)
+
+    mesh = sphere(args.segments)
+    print(
+        f"{mesh.vertex_count} vertices, {len(mesh.indices) // 3} triangles, {width}x{height}, "
+        f"{ctx.info['GL_RENDERER']}"
+    )
+    print(f"{'format':<16}{'bytes':>6}{'vbo MB':>9}{'p50 ms':>9}{'p95 ms':>9}{'GB/s':>8}{'pos err':>10}{'uv err':>10}")
+    for fmt in FORMATS:
+        packed = mesh if fmt == mesh.fmt else mesh.quantized(fmt)
+        error = np.abs(geometry.dequantize(packed.vertices) - mesh.vertices).max(axis=0)
+        vao = packed.vertex_array(ctx, prog, "position", "in_texture_coords")
+        times = []
+        for frame in range(args.warmup + args.frames):
+            start = perf_counter()
+            fbo.clear(0.1, 0.2, 0.3, 1.0)
+            vao.render(moderngl.TRIANGLES)
+            ctx.finish()
+            if frame >= args.warmup:
+                times.append(perf_counter() - start)
+        stats = summarize(times)
+        size = packed.vertices.nbytes
+        print(
+            f"{fmt:<16}{packed.stride:>6}{size / 2**20:>9.1f}{stats['p50']:>9.2f}{stats['p95']:>9.2f}"
+            f"{size / stats['p50'] / 1e6:>8.2f}{error[:3].max():>10.2e}{error[3:].max():>10.2e}"
+        )
+        vao.release()
+
+
+if __name__ == "__main__":
+    main()
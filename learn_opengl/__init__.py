@@ -0,0 +1 @@
+"""Shared helpers for the learn-opengl lessons."""
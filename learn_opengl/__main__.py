@@ -0,0 +1,3 @@
+from learn_opengl.launcher import main
+
+main()
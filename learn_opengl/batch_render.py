@@ -0,0 +1,175 @@
+"""Render the textured cube of ``025-look-around-camera.py`` from many camera poses, in parallel.
+
+One process with one context renders, reads back and PNG-encodes every image
+in turn, on one core. :func:`render_poses` shards the pose list into chunks
+over a process pool instead. Every worker creates its own standalone context
+once, renders its chunks through an :class:`~learn_opengl.readback.AsyncReadback`
+ring and writes ``NNNNNN.png`` files named after the pose index, so the image
+set on disk is in pose order whichever worker finished first. The poses are
+saved next to them as ``poses.npy``::
+
+    python -m learn_opengl.batch_render --poses 5000 --workers 8 --output renders/
+
+llvmpipe spreads rasterization over a thread per core on its own. With one
+process per core that oversubscribes the machine, so workers are started with
+``LP_NUM_THREADS=1`` (unless it is set already) and the parallelism comes from
+the processes, which also split the Python and PNG encoding work.
+"""
+import argparse
+import multiprocessing
+import os
+import runpy
+from collections import deque
+from pathlib import Path
+from time import perf_counter
+from typing import Optional, Tuple
+
+import moderngl
+import numpy as np
+import pyrr
+from PIL import Image
+
+from learn_opengl import geometry, headless, programs, textures, uniforms
+from learn_opengl.readback import AsyncReadback
+
+#: Scene rendered by the workers
+LESSON = headless.ROOT / "025-look-around-camera.py"
+
+# per worker process state, set up once by _init_worker
+_worker = None
+_ready = None
+
+
+def orbit_poses(count: int, radius: float = 3.0) -> np.ndarray:
+    """``(count, 3)`` eye positions spread evenly over a sphere around the origin (a Fibonacci lattice)."""
+    index = np.arange(count, dtype=np.float64) + 0.5
+    # stay clear of the poles, where the look-at up vector degenerates
+    y = 0.95 * (1.0 - 2.0 * index / count)
+    ring = np.sqrt(1.0 - y * y)
+    angle = np.pi * (3.0 - np.sqrt(5.0)) * index
+    return (np.column_stack([ring * np.sin(angle), y, ring * np.cos(angle)]) * radius).astype(np.float32)
+
+
+class _Worker:
+    """Context, scene and readback ring of one worker process."""
+
+    def __init__(self, size: Tuple[int, int], backend: Optional[str], output: Path):
+        kwargs = {"backend": backend} if backend else {}
+        self.ctx = moderngl.create_standalone_context(**kwargs)
+        self.ctx.enable(moderngl.DEPTH_TEST)
+        self.fbo = self.ctx.simple_framebuffer(size)
+        self.fbo.use()
+        self.output = output
+
+        vertices = runpy.run_path(str(LESSON))["VERTICES"]
+        prog = programs.registry(self.ctx).load("textured_cube")
+        prog["model"] = pyrr.matrix44.create_identity(dtype=np.float32).flatten()
+        textures.load_texture(self.ctx, LESSON.parent / "textures" / "face.png").use(location=0)
+        mesh = geometry.index_mesh(vertices, "3f 2f").quantized("3f2 x2 2f2")
+        self.vao = mesh.vertex_array(self.ctx, prog, "position", "in_texture_coords")
+
+        self.camera_block = uniforms.camera_block(self.ctx)
+        self.camera_block.update(
+            projection=pyrr.matrix44.create_perspective_projection(
+                fovy=45.0, aspect=size[0] / size[1], near=0.1, far=100.0, dtype=np.float32
+            )
+        )
+        self.readback = AsyncReadback(self.ctx, size, components=3, depth=2)
+
+    def render(self, start: int, eyes: np.ndarray) -> int:
+        """Render and save the poses ``start`` to ``start + len(eyes)``."""
+        indices = deque()
+        for index, eye in enumerate(eyes, start):
+            view = pyrr.matrix44.create_look_at(eye, (0.0, 0.0, 0.0), (0.0, 1.0, 0.0), dtype=np.float32)
+            self.camera_block.update(view=view, eye=eye)
+            self.fbo.clear(0.0, 0.0, 0.0, 1.0)
+            self.vao.render(moderngl.TRIANGLES)
+            # the PNG of the previous pose is encoded while this one renders
+            indices.append(index)
+            done = self.readback.push(self.fbo)
+            if done is not None:
+                self._save(indices.popleft(), done[1])
+        for _, pixels in self.readback.drain():
+            self._save(indices.popleft(), pixels)
+        return len(eyes)
+
+    def _save(self, index: int, pixels: np.ndarray) -> None:
+        Image.fromarray(np.ascontiguousarray(pixels), "RGB").save(self.output / f"{index:06d}.png")
+
+
+def _init_worker(size, backend, output, ready) -> None:
+    global _worker, _ready
+    # read by llvmpipe when the context is created
+    os.environ.setdefault("LP_NUM_THREADS", "1")
+    _worker = _Worker(size, backend, output)
+    _ready = ready
+
+
+def _wait_ready(_) -> None:
+    # blocks until every worker runs one of these, so each worker gets exactly one
+    _ready.wait()
+
+
+def _render_chunk(task) -> int:
+    start, eyes = task
+    return _worker.render(start, eyes)
+
+
+def render_poses(
+    eyes: np.ndarray,
+    output,
+    workers: Optional[int] = None,
+    size: Tuple[int, int] = (512, 512),
+    backend: Optional[str] = "egl",
+    chunk_size: Optional[int] = None,
+) -> float:
+    """Render a PNG per row of ``eyes`` into ``output`` with ``workers`` processes; returns the wall time.
+
+    :param workers: number of processes, one per core by default.
+    :param chunk_size: poses per task, by default enough for about four tasks
+        per worker so that an early finisher picks up more work.
+    """
+    output = Path(output)
+    output.mkdir(parents=True, exist_ok=True)
+    np.save(output / "poses.npy", eyes)
+    workers = workers or os.cpu_count() or 1
+    chunk_size = chunk_size or max(1, -(-len(eyes) // (workers * 4)))
+    tasks = [(start, eyes[start : start + chunk_size]) for start in range(0, len(eyes), chunk_size)]
+
+    # spawn, not fork: the workers must not inherit any GL state of the parent
+    context = multiprocessing.get_context("spawn")
+    ready = context.Barrier(workers)
+    pool = context.Pool(workers, _init_worker, (tuple(size), backend, output, ready))
+    with pool:
+        # let every worker build its context before the clock starts
+        pool.map(_wait_ready, range(workers), chunksize=1)
+        start = perf_counter()
+        rendered = sum(pool.imap_unordered(_render_chunk, tasks))
+        elapsed = perf_counter() - start
+    if rendered != len(eyes):
+        raise RuntimeError(f"rendered {rendered} of {len(eyes)} poses")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--poses", type=int, default=1000, help="number of camera poses around the cube")
+    parser.add_argument("--radius", type=float, default=3.0, help="distance of the camera from the cube")
+    parser.add_argument("--workers", type=int, help="worker processes, one per core by default")
+    parser.add_argument("--chunk-size", type=int, help="poses per task")
+    parser.add_argument("--size", type=headless.parse_size, default=(512, 512), help="WIDTHxHEIGHT")
+    parser.add_argument("--output", type=Path, default=Path("renders"), help="directory to write the images to")
+    parser.add_argument("--backend", default="egl", help='glcontext backend, "" for the platform default')
+    args = parser.parse_args()
+
+    workers = args.workers or os.cpu_count() or 1
+    eyes = orbit_poses(args.poses, args.radius)
+    elapsed = render_poses(eyes, args.output, workers, args.size, args.backend or None, args.chunk_size)
+    print(
+        f"{len(eyes)} poses at {args.size[0]}x{args.size[1]} with {workers} workers in {elapsed:.3f}s: "
+        f"{len(eyes) / elapsed:.1f} fps, {len(eyes) / elapsed / workers:.1f} fps per worker"
+    )
+
+
+if __name__ == "__main__":
+    main()
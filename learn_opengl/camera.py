@@ -0,0 +1,144 @@
+"""First-person camera shared by the camera lessons (026-028).
+
+The lessons used to keep the camera in a dict, call ``np.sin(np.deg2rad(...))``
+on scalars a dozen times per move and rebuild ``create_look_at`` every frame.
+:class:`Camera` keeps position and orientation in plain floats, caches the
+sines and cosines of its angles when they change, and rebuilds the view
+matrix only when it moved::
+
+    camera = Camera(position=(0.0, 0.0, 3.0))
+    camera.rotate(yaw=dx * 0.1, pitch=-dy * 0.1)
+    camera.move(forward=0.05)
+    if camera.dirty:
+        camera_block.update(view=camera.view, eye=camera.position)
+
+Yaw turns right around the world up axis, 0 looking down -Z; pitch looks up
+and is clamped short of the vertical. Moves stay in the horizontal plane, so
+looking up does not make the camera fly.
+"""
+import math
+from typing import Tuple
+
+import numpy as np
+
+#: Pitch limit in degrees; at 90 the view direction and the up axis coincide
+MAX_PITCH = 89.0
+
+
+class Camera:
+    """Position and yaw/pitch orientation (in degrees) with a lazily rebuilt view matrix."""
+
+    __slots__ = ("x", "y", "z", "_yaw", "_pitch", "_sin_yaw", "_cos_yaw", "_sin_pitch", "_cos_pitch", "_view", "dirty")
+
+    def __init__(self, position: Tuple[float, float, float] = (0.0, 0.0, 3.0), yaw: float = 0.0, pitch: float = 0.0):
+        self.x, self.y, self.z = (float(value) for value in position)
+        self._view = np.empty((4, 4), dtype=np.float32)
+        #: True when the position or orientation changed since ``view`` was last read
+        self.dirty = True
+        self._set_yaw(yaw)
+        self._set_pitch(pitch)
+
+    def _set_yaw(self, yaw: float) -> None:
+        self._yaw = yaw % 360.0
+        radians = math.radians(self._yaw)
+        self._sin_yaw = math.sin(radians)
+        self._cos_yaw = math.cos(radians)
+
+    def _set_pitch(self, pitch: float) -> None:
+        self._pitch = min(max(pitch, -MAX_PITCH), MAX_PITCH)
+        radians = math.radians(self._pitch)
+        self._sin_pitch = math.sin(radians)
+        self._cos_pitch = math.cos(radians)
+
+    @property
+    def position(self) -> Tuple[float, float, float]:
+        return self.x, self.y, self.z
+
+    @property
+    def yaw(self) -> float:
+        return self._yaw
+
+    @property
+    def pitch(self) -> float:
+        return self._pitch
+
+    @property
+    def front(self) -> Tuple[float, float, float]:
+        """Unit view direction."""
+        return self._cos_pitch * self._sin_yaw, self._sin_pitch, -self._cos_pitch * self._cos_yaw
+
+    @property
+    def state(self) -> Tuple[float, float, float, float, float]:
+        """``(x, y, z, yaw, pitch)``"""
+        return self.x, self.y, self.z, self._yaw, self._pitch
+
+    def set_state(self, state: Tuple[float, float, float, float, float]) -> None:
+        if state == self.state:
+            return
+        self.x, self.y, self.z, yaw, pitch = state
+        self._set_yaw(yaw)
+        self._set_pitch(pitch)
+        self.dirty = True
+
+    def set_between(self, start: Tuple, end: Tuple, alpha: float) -> None:
+        """Set the state ``alpha`` (0..1) of the way from ``start`` to ``end``, turning the short way round."""
+        if start == end:
+            self.set_state(end)
+            return
+        x0, y0, z0, yaw0, pitch0 = start
+        x1, y1, z1, yaw1, pitch1 = end
+        yaw_delta = (yaw1 - yaw0 + 180.0) % 360.0 - 180.0
+        self.set_state(
+            (
+                x0 + (x1 - x0) * alpha,
+                y0 + (y1 - y0) * alpha,
+                z0 + (z1 - z0) * alpha,
+                yaw0 + yaw_delta * alpha,
+                pitch0 + (pitch1 - pitch0) * alpha,
+            )
+        )
+
+    def rotate(self, yaw: float = 0.0, pitch: float = 0.0) -> None:
+        """Turn by ``yaw`` degrees to the right and ``pitch`` degrees up."""
+        if yaw:
+            self._set_yaw(self._yaw + yaw)
+            self.dirty = True
+        if pitch:
+            previous = self._pitch
+            self._set_pitch(previous + pitch)
+            self.dirty = self.dirty or self._pitch != previous
+
+    def move(self, forward: float = 0.0, right: float = 0.0, up: float = 0.0) -> None:
+        """Walk ``forward`` along the horizontal view direction, strafe ``right`` and rise ``up``."""
+        if not (forward or right or up):
+            return
+        sin_yaw, cos_yaw = self._sin_yaw, self._cos_yaw
+        self.x += forward * sin_yaw + right * cos_yaw
+        self.y += up
+        self.z += right * sin_yaw - forward * cos_yaw
+        self.dirty = True
+
+    @property
+    def view(self) -> np.ndarray:
+        """``pyrr`` row-major view matrix, same as ``create_look_at(position, position + front, (0, 1, 0))``.
+
+        The returned array is reused and only rebuilt after a change.
+        """
+        if self.dirty:
+            self._update_view()
+            self.dirty = False
+        return self._view
+
+    def _update_view(self) -> None:
+        sy, cy, sp, cp = self._sin_yaw, self._cos_yaw, self._sin_pitch, self._cos_pitch
+        x, y, z = self.x, self.y, self.z
+        # front f = (cp*sy, sp, -cp*cy), side s = normalize(f x up) = (cy, 0, sy),
+        # camera up u = s x f = (-sy*sp, cp, cy*sp)
+        fx, fy, fz = cp * sy, sp, -cp * cy
+        ux, uy, uz = -sy * sp, cp, cy * sp
+        self._view[:] = (
+            (cy, ux, -fx, 0.0),
+            (0.0, uy, -fy, 0.0),
+            (sy, uz, -fz, 0.0),
+            (-(cy * x + sy * z), -(ux * x + uy * y + uz * z), fx * x + fy * y + fz * z, 1.0),
+        )
@@ -0,0 +1,61 @@
+"""Vectorized view-frustum culling on the CPU.
+
+The lessons submit every cube whether the camera sees it or not. Here the six
+planes of the view frustum are extracted from ``view`` and ``projection``
+(``pyrr`` row-major matrices, as passed to the shaders) and ``N`` bounding
+volumes are tested against all of them in one NumPy pass::
+
+    planes = culling.frustum_planes(view, projection)
+    visible = culling.spheres_visible(planes, cube_positions, mesh.radius)
+    instance_vbo.write(models[visible])
+    vao.render(moderngl.TRIANGLES, instances=int(visible.sum()))
+
+The test is conservative: a volume straddling a plane, or lying outside the
+frustum near one of its corners, is kept. Culling only skips what is certainly
+invisible.
+"""
+import numpy as np
+
+
+def frustum_planes(view, projection) -> np.ndarray:
+    """The ``(6, 4)`` float32 planes (left, right, bottom, top, near, far) of ``view`` x ``projection``.
+
+    Each plane ``(a, b, c, d)`` is normalized so that ``a*x + b*y + c*z + d``
+    is the signed distance of ``(x, y, z)`` to it, positive inside.
+    """
+    # row vectors: clip = [x, y, z, 1] @ view @ projection, so clip.x is the dot
+    # product with the first column, i.e. the first row of the transpose
+    m = (np.asarray(view, dtype=np.float64) @ np.asarray(projection, dtype=np.float64)).T
+    planes = np.stack([m[3] + m[0], m[3] - m[0], m[3] + m[1], m[3] - m[1], m[3] + m[2], m[3] - m[2]])
+    planes /= np.linalg.norm(planes[:, :3], axis=1, keepdims=True)
+    return planes.astype(np.float32)
+
+
+def spheres_visible(planes: np.ndarray, centers, radii) -> np.ndarray:
+    """``(N,)`` bool mask of the spheres intersecting the frustum.
+
+    :param planes: ``(6, 4)`` planes from :func:`frustum_planes`.
+    :param centers: ``(N, 3)`` world-space centers.
+    :param radii: a scalar or ``(N,)`` array of radii.
+    """
+    centers = np.asarray(centers, dtype=np.float32)
+    # (6, N) signed distances, one matrix product for all planes. Plane-major so
+    # the reduction below runs over 6 contiguous rows rather than along N short
+    # rows, which is several times slower in NumPy
+    distances = planes[:, :3] @ centers.T
+    distances += planes[:, 3:]
+    radii = np.asarray(radii, dtype=np.float32)
+    return distances.min(axis=0) >= -radii
+
+
+def aabbs_visible(planes: np.ndarray, mins, maxs) -> np.ndarray:
+    """``(N,)`` bool mask of the axis-aligned boxes ``mins``..``maxs`` (``(N, 3)`` each) intersecting the frustum."""
+    mins = np.asarray(mins, dtype=np.float32)
+    maxs = np.asarray(maxs, dtype=np.float32)
+    centers = (mins + maxs) * 0.5
+    extents = (maxs - mins) * 0.5
+    # distance of the box corner furthest along each plane's normal
+    distances = planes[:, :3] @ centers.T
+    distances += np.abs(planes[:, :3]) @ extents.T
+    distances += planes[:, 3:]
+    return distances.min(axis=0) >= 0.0
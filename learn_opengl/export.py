@@ -0,0 +1,150 @@
+"""Export animated lessons to video faster than real time.
+
+Recording a lesson from its window means watching it: the animation follows
+the wall clock. :func:`export_lesson` runs the lesson headless on a
+:class:`~learn_opengl.headless.VirtualTimer` instead, so frame ``n`` shows the
+scene at exactly ``n / fps`` seconds however long it took to draw, reads every
+frame back asynchronously and hands it to a :class:`VideoEncoder`, which
+converts and encodes with ``cv2.VideoWriter`` on a background thread while the
+next frames render. A 60 second clip takes as long as rendering 3600 frames::
+
+    python -m learn_opengl.export 021-cube-textures-more-cubes.py --seconds 60 --fps 60
+    python -m learn_opengl.export --seconds 10 --size 640x360 --output videos/  # every animated lesson
+"""
+import argparse
+import queue
+import threading
+from pathlib import Path
+from time import perf_counter
+from typing import Optional, Tuple
+
+import cv2
+import numpy as np
+
+from learn_opengl import headless
+
+#: Lessons animated by ``moderngl_window.timers.clock.Timer``
+ANIMATED_LESSONS = (
+    "014-rotation-texture-animation.py",
+    "018-hello-3d-animate.py",
+    "021-cube-textures-more-cubes.py",
+    "022-cube-textures-more-cubes-eulers.py",
+    "023-cube-textures-more-cubes-eulers-rand-rot.py",
+    "024-camera-view.py",
+    "025-look-around-camera.py",
+)
+
+
+class VideoEncoder:
+    """``cv2.VideoWriter`` fed from a bounded queue by a background thread.
+
+    :meth:`write` only queues the frame; colour conversion and encoding, both
+    of which release the GIL in OpenCV, run on the encoder thread. Once
+    ``queue_size`` frames are waiting, :meth:`write` blocks until the encoder
+    catches up, which keeps memory bounded when encoding is the slower side.
+
+    :param fourcc: four character code of the codec, ``"mp4v"`` works with the
+        ``opencv-python`` wheels out of the box.
+    """
+
+    def __init__(self, path, fps: float, size: Tuple[int, int], fourcc: str = "mp4v", queue_size: int = 8):
+        self.path = Path(path)
+        self.writer = cv2.VideoWriter(str(self.path), cv2.VideoWriter_fourcc(*fourcc), fps, tuple(size))
+        if not self.writer.isOpened():
+            raise RuntimeError(f"cannot open a {fourcc!r} video writer for {self.path}")
+        self.frames = 0
+        self._queue: "queue.Queue[Optional[np.ndarray]]" = queue.Queue(maxsize=queue_size)
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(target=self._encode, name=f"encode {self.path.name}", daemon=True)
+        self._thread.start()
+
+    def write(self, pixels: np.ndarray) -> None:
+        """Queue an RGBA or RGB ``(height, width, components)`` uint8 frame, top row first."""
+        if self._error is not None:
+            raise RuntimeError("video encoding failed") from self._error
+        self._queue.put(pixels)
+
+    def _encode(self) -> None:
+        conversion = {3: cv2.COLOR_RGB2BGR, 4: cv2.COLOR_RGBA2BGR}
+        while True:
+            pixels = self._queue.get()
+            if pixels is None:
+                return
+            if self._error is not None:
+                continue  # keep draining so write() never blocks forever
+            try:
+                self.writer.write(cv2.cvtColor(pixels, conversion[pixels.shape[2]]))
+                self.frames += 1
+            except BaseException as error:
+                self._error = error
+
+    def close(self) -> None:
+        """Encode the frames still queued and finalize the file."""
+        self._queue.put(None)
+        self._thread.join()
+        self.writer.release()
+        if self._error is not None:
+            raise RuntimeError("video encoding failed") from self._error
+
+    def __enter__(self) -> "VideoEncoder":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def export_lesson(
+    path,
+    output,
+    seconds: float = 10.0,
+    fps: float = 60.0,
+    size: Tuple[int, int] = (1280, 720),
+    backend: Optional[str] = "egl",
+    fourcc: str = "mp4v",
+    anisotropy: Optional[float] = None,
+) -> headless.LessonRun:
+    """Render ``seconds`` of the lesson at ``path`` on a virtual clock and encode them to ``output``.
+
+    :param anisotropy: anisotropic filtering of the lesson's textures, off by
+        default (see :data:`learn_opengl.textures.SAMPLING`).
+    """
+    with VideoEncoder(output, fps, size, fourcc) as encoder:
+        return headless.run_lesson(
+            path,
+            frames=round(seconds * fps),
+            size=size,
+            backend=backend,
+            capture=lambda index, pixels: encoder.write(pixels),
+            fps=fps,
+            sampling=None if anisotropy is None else {"anisotropy": anisotropy},
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("lessons", nargs="*", type=Path, help="lesson scripts, every animated lesson by default")
+    parser.add_argument("--seconds", type=float, default=10.0, help="length of each clip")
+    parser.add_argument("--fps", type=float, default=60.0)
+    parser.add_argument("--size", type=headless.parse_size, default=(1280, 720), help="WIDTHxHEIGHT")
+    parser.add_argument("--output", type=Path, default=Path("videos"), help="directory to write the clips to")
+    parser.add_argument("--fourcc", default="mp4v", help="codec four character code")
+    parser.add_argument("--anisotropy", type=float, help="texture anisotropy, anisotropic filtering is off by default")
+    parser.add_argument("--backend", default="egl", help='glcontext backend, "" for the platform default')
+    args = parser.parse_args()
+
+    args.output.mkdir(parents=True, exist_ok=True)
+    for path in args.lessons or [headless.ROOT / name for name in ANIMATED_LESSONS]:
+        output = args.output / f"{path.stem}.mp4"
+        start = perf_counter()
+        run = export_lesson(
+            path, output, args.seconds, args.fps, args.size, args.backend or None, args.fourcc, args.anisotropy
+        )
+        elapsed = perf_counter() - start
+        print(
+            f"{path.name:<52} {run.frames:>5} frames {elapsed:>8.3f}s "
+            f"({run.frames / args.fps / elapsed:.1f}x real time) -> {output}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""Frame rate cap without vsync and without spinning a core.
+
+With ``vsync = False`` a render loop runs as fast as it can and burns a CPU
+core on frames nobody sees; with ``vsync = True`` the pacing is up to the
+driver. :class:`FrameLimiter` holds each frame to a fixed deadline instead.
+It sleeps through most of the wait, since ``time.sleep`` may overshoot by a
+scheduler tick, and spins on ``perf_counter`` for the last ``spin``
+seconds::
+
+    limiter = FrameLimiter(fps=30)
+    while not window.is_closing:
+        ...
+        window.swap_buffers()
+        limiter.wait()
+    limiter.log_stats()
+
+``WindowConfig`` apps call ``wait()`` at the end of ``render``. The measured
+frame intervals are kept so the pacing jitter can be reported.
+"""
+import logging
+import time
+from collections import deque
+from time import perf_counter
+from typing import Dict
+
+from learn_opengl.stats import summarize
+
+logger = logging.getLogger(__name__)
+
+
+class FrameLimiter:
+    """Paces calls to :meth:`wait` to ``fps`` per second.
+
+    :param spin: seconds before the deadline at which sleeping stops and busy
+        waiting starts. Raise it where sleeps are coarse (Windows' default
+        timer resolution is 15.6ms), lower it to save CPU.
+    :param history: number of frame intervals kept for :meth:`stats`.
+    """
+
+    def __init__(self, fps: float = 60.0, spin: float = 0.002, history: int = 600):
+        self.period = 1.0 / fps
+        self.spin = spin
+        self.intervals = deque(maxlen=history)
+        self._deadline = None
+        self._last = None
+
+    def wait(self) -> None:
+        """Block until the end of the current frame's time slot.
+
+        The first call only starts the clock: the frame before it has no slot to wait out.
+        """
+        now = perf_counter()
+        if self._deadline is None:
+            self._last = now
+            self._deadline = now + self.period
+            return
+        remaining = self._deadline - now
+        if remaining > self.spin:
+            time.sleep(remaining - self.spin)
+        while perf_counter() < self._deadline:
+            pass
+
+        now = perf_counter()
+        if self._last is not None:
+            self.intervals.append(now - self._last)
+        self._last = now
+        self._deadline += self.period
+        if self._deadline < now:
+            # the frame overran a whole slot: start again from here rather than
+            # rushing the following frames to catch up
+            self._deadline = now + self.period
+
+    def stats(self) -> Dict[str, float]:
+        """Frame interval statistics in milliseconds, ``jitter`` being the mean absolute deviation from the target."""
+        stats = summarize(self.intervals)
+        stats["target"] = self.period * 1e3
+        stats["jitter"] = (
+            sum(abs(interval - self.period) for interval in self.intervals) / len(self.intervals) * 1e3
+            if self.intervals
+            else 0.0
+        )
+        return stats
+
+    def log_stats(self, level: int = logging.INFO) -> None:
+        stats = self.stats()
+        if not stats["count"]:
+            return
+        logger.log(
+            level,
+            "frame pacing: target %.3fms, mean %.3fms, jitter %.3fms, p99 %.3fms, max %.3fms over %d frames",
+            stats["target"], stats["mean"], stats["jitter"], stats["p99"], stats["max"], stats["count"],
+        )
@@ -0,0 +1,192 @@
+"""Indexed meshes built from the lessons' expanded vertex arrays.
+
+The cube ``VERTICES`` of the lessons list all 36 corners of the 12 triangles,
+each one written out in full even though only 16 (position, uv) combinations
+are distinct. :func:`index_mesh` keeps every distinct vertex once, in order of
+first appearance, and replaces the repetition with an index buffer::
+
+    mesh = geometry.index_mesh(VERTICES, "3f 2f")    # 36 vertices -> 16 + 36 indices
+    vao = mesh.vertex_array(ctx, prog, "position", "in_texture_coords")
+    vao.render(moderngl.TRIANGLES)
+
+Indices are ``uint16`` whenever the vertex count allows it, ``uint32``
+otherwise. Besides the smaller vertex buffer, the GPU's post-transform cache
+then runs the vertex shader once per distinct vertex instead of once per
+corner.
+
+The lessons' arrays are all ``float32``. :func:`quantize` (or
+:meth:`Mesh.quantized`) packs them into a smaller layout described by an
+explicit moderngl format, which :meth:`Mesh.vertex_array` passes on to
+``ctx.vertex_array``::
+
+    mesh = geometry.index_mesh(VERTICES, "3f 2f").quantized("3f2 x2 2f2")  # 20 -> 12 bytes per vertex
+
+Supported codes are ``f``/``f4`` (float), ``f2`` (half float, exact for
+integers up to 2048 and with 11 significant bits), ``f1`` (unsigned byte
+normalized to ``[0, 1]``, for colours and coarse texture coordinates),
+``i``/``i4`` (32-bit integer, such as a texture layer) and ``x`` padding. moderngl 5.8 has no code for normalized 16-bit integers, so
+texture coordinates that need more than 8 bits go to ``f2``. Keep every
+attribute at a multiple of 4 bytes (``3f2 x2``, ``3f1 x1``): drivers fetch
+misaligned attributes slowly, or convert the buffer on the CPU.
+"""
+import re
+from dataclasses import dataclass
+from typing import List, Optional, Sequence, Tuple
+
+import moderngl
+import numpy as np
+
+
+# numpy types of the attribute codes quantize() can pack to; f1 is normalized
+_PACKED = {"f": np.float32, "f4": np.float32, "f2": np.float16, "f1": np.uint8, "i": np.int32, "i4": np.int32}
+
+
+def _attributes(fmt: str) -> List[Tuple[int, Optional[str]]]:
+    """``(components, code)`` of each attribute of the moderngl format ``fmt``; padding is ``(bytes, None)``."""
+    attributes = []
+    for token in fmt.split():
+        if token.endswith(("/v", "/i", "/r")):
+            token = token[:-2]
+        match = re.fullmatch(r"(\d*)([fi]\d?|x(\d?))", token)
+        if match is None or (match.group(3) is None and match.group(2) not in _PACKED):
+            raise ValueError(f"unsupported vertex format {token!r} in {fmt!r}")
+        count = int(match.group(1) or 1)
+        if match.group(3) is not None:
+            attributes.append((count * int(match.group(3) or 1), None))
+        else:
+            attributes.append((count, match.group(2)))
+    return attributes
+
+
+def components(fmt: str) -> int:
+    """Number of components per vertex described by a moderngl format like ``"3f 2f"``, padding excluded."""
+    return sum(count for count, code in _attributes(fmt) if code is not None)
+
+
+def vertex_dtype(fmt: str) -> np.dtype:
+    """Structured dtype of one vertex laid out as ``fmt``; attribute ``i`` is the field ``"a{i}"``, padding unnamed."""
+    names, formats, offsets = [], [], []
+    offset = 0
+    for count, code in _attributes(fmt):
+        if code is None:
+            offset += count
+            continue
+        dtype = np.dtype(_PACKED[code])
+        names.append(f"a{len(names)}")
+        formats.append((dtype, (count,)))
+        offsets.append(offset)
+        offset += count * dtype.itemsize
+    return np.dtype({"names": names, "formats": formats, "offsets": offsets, "itemsize": offset})
+
+
+def quantize(vertices: np.ndarray, fmt: str, packed: str) -> np.ndarray:
+    """Convert float ``vertices`` laid out as ``fmt`` to a structured array laid out as ``packed``.
+
+    ``packed`` lists the same attributes with the same component counts, in
+    another type and with optional padding. Values a type cannot hold raise a
+    :class:`ValueError` rather than being clipped.
+    """
+    rows = np.ascontiguousarray(vertices, dtype=np.float32).reshape(-1, components(fmt))
+    dtype = vertex_dtype(packed)
+    counts = [count for count, code in _attributes(fmt) if code is not None]
+    if counts != [dtype.fields[name][0].shape[0] for name in dtype.names]:
+        raise ValueError(f"{packed!r} does not hold the attributes of {fmt!r}")
+    out = np.zeros(len(rows), dtype=dtype)
+    column = 0
+    for name, count in zip(dtype.names, counts):
+        values = rows[:, column : column + count]
+        column += count
+        target = dtype.fields[name][0].base
+        if target == np.uint8:
+            if values.size and (values.min() < 0.0 or values.max() > 1.0):
+                raise ValueError(f"attribute {name} leaves [0, 1], too wide for normalized bytes (f1)")
+            out[name] = np.rint(values * 255.0)
+        elif target == np.float16:
+            if values.size and np.abs(values).max() > np.finfo(np.float16).max:
+                raise ValueError(f"attribute {name} overflows half floats (f2)")
+            out[name] = values
+        else:
+            out[name] = values
+    return out
+
+
+def dequantize(vertices: np.ndarray) -> np.ndarray:
+    """The ``float32`` rows of packed ``vertices`` from :func:`quantize`; float rows are returned as they are."""
+    if vertices.dtype.names is None:
+        return vertices
+    columns = []
+    for name in vertices.dtype.names:
+        values = vertices[name].astype(np.float32)
+        columns.append(values / 255.0 if vertices.dtype.fields[name][0].base == np.uint8 else values)
+    return np.hstack(columns)
+
+
+def index_dtype(vertex_count: int) -> np.dtype:
+    """The smallest index type able to address ``vertex_count`` vertices."""
+    return np.dtype(np.uint16 if vertex_count <= np.iinfo(np.uint16).max + 1 else np.uint32)
+
+
+@dataclass
+class Mesh:
+    """Unique interleaved vertices and the indices drawing them as triangles."""
+
+    vertices: np.ndarray
+    indices: np.ndarray
+    fmt: str
+
+    @property
+    def vertex_count(self) -> int:
+        return len(self.vertices)
+
+    @property
+    def index_element_size(self) -> int:
+        return self.indices.dtype.itemsize
+
+    @property
+    def stride(self) -> int:
+        """Bytes per vertex."""
+        return self.vertices.nbytes // len(self.vertices)
+
+    @property
+    def radius(self) -> float:
+        """Radius of the bounding sphere around the model origin, positions being the first 3 components."""
+        return float(np.linalg.norm(dequantize(self.vertices)[:, :3], axis=1).max())
+
+    def quantized(self, packed: str) -> "Mesh":
+        """This mesh with its vertices packed as ``packed`` by :func:`quantize`, sharing the indices."""
+        return Mesh(vertices=quantize(self.vertices, self.fmt, packed), indices=self.indices, fmt=packed)
+
+    def vertex_array(
+        self,
+        ctx: moderngl.Context,
+        program: moderngl.Program,
+        *attributes: str,
+        instances: Sequence[Tuple] = (),
+    ) -> moderngl.VertexArray:
+        """Upload the mesh and bind it to ``attributes`` of ``program``.
+
+        :param instances: extra ``(buffer, format, *attributes)`` entries, such
+            as a per-instance ``(buffer, "16f/i", "model")``.
+        """
+        vbo = ctx.buffer(self.vertices)
+        ibo = ctx.buffer(self.indices)
+        return ctx.vertex_array(
+            program,
+            [(vbo, self.fmt, *attributes), *instances],
+            index_buffer=ibo,
+            index_element_size=self.index_element_size,
+        )
+
+
+def index_mesh(vertices: np.ndarray, fmt: str) -> Mesh:
+    """Deduplicate the expanded triangle list ``vertices`` (laid out as ``fmt``) into a :class:`Mesh`."""
+    rows = np.ascontiguousarray(vertices, dtype=np.float32).reshape(-1, components(fmt))
+    _, first, inverse = np.unique(rows, axis=0, return_index=True, return_inverse=True)
+    # np.unique sorts; renumber the unique vertices in order of first use to keep
+    # neighbouring triangles close together in the vertex buffer
+    order = np.argsort(first)
+    rank = np.empty_like(order)
+    rank[order] = np.arange(len(order))
+    unique = rows[first[order]]
+    indices = rank[inverse.reshape(-1)].astype(index_dtype(len(unique)))
+    return Mesh(vertices=unique, indices=indices, fmt=fmt)
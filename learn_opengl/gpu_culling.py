@@ -0,0 +1,92 @@
+"""Frustum culling of instanced draws on the GPU.
+
+:mod:`learn_opengl.culling` still costs a NumPy pass over every object and an
+upload of the visible models each frame. Here the instance buffer stays on
+the GPU: a transform feedback pass (``VertexArray.transform``) over the model
+matrices keeps those whose bounding sphere intersects the frustum, packing
+them into :attr:`GpuCuller.visible`, and counts them straight into an indirect
+draw command. The CPU only computes the six frustum planes::
+
+    culler = GpuCuller(ctx, instance_vbo, len(models), mesh.radius, len(mesh.indices))
+    vao = mesh.vertex_array(ctx, prog, "position", "in_texture_coords",
+                            instances=[(culler.visible, "16f/i", "model")])
+    while True:
+        culler.cull(view, projection)
+        culler.render(vao)
+
+Objects that only spin in place need no per-frame upload either: with
+``eulers=True`` the buffer holds their ``3f 3f`` position and euler angles,
+written once, and the culling pass builds the model matrices itself at the
+``time`` of the ``Camera`` block (:mod:`learn_opengl.uniforms`)::
+
+    instances = np.hstack([positions, eulers]).astype(np.float32)
+    culler = GpuCuller(ctx, ctx.buffer(instances), len(instances), mesh.radius, len(mesh.indices), eulers=True)
+    while True:
+        camera_block.update(time=timer.time)
+        culler.cull(view, projection)
+        culler.render(vao)
+
+The count is written from the culling shader into a storage buffer, which
+needs OpenGL 4.3.
+"""
+from typing import Optional
+
+import moderngl
+import numpy as np
+
+from learn_opengl import culling, programs
+
+#: Element type of the ``glDrawElementsIndirect`` command
+#: (index count, instance count, first index, base vertex, base instance)
+COMMAND_DTYPE = np.dtype(np.uint32)
+
+
+class GpuCuller:
+    """Culls ``count`` ``16f`` model matrices of ``models`` for an indexed draw of ``vertices`` indices.
+
+    :param radius: bounding sphere radius of the mesh around its origin
+        (:attr:`learn_opengl.geometry.Mesh.radius`); the model matrices must not scale.
+    :param eulers: ``models`` holds ``3f 3f`` positions and euler angles instead,
+        turned into ``transforms.from_eulers(positions, eulers, time)`` on the GPU.
+    """
+
+    def __init__(
+        self,
+        ctx: moderngl.Context,
+        models: moderngl.Buffer,
+        count: int,
+        radius: float,
+        vertices: int,
+        eulers: bool = False,
+    ):
+        if ctx.version_code < 430:
+            raise RuntimeError(f"GPU culling needs OpenGL 4.3, the context is {ctx.version_code}")
+        self.ctx = ctx
+        self.count = count
+        # learn_opengl/shaders/cull_instances.glsl
+        defines = {"EULERS": 1} if eulers else None
+        self.program = programs.registry(ctx).load("cull_instances", defines, varyings=["out_model"])
+        self.program["radius"] = radius
+        attributes = ("3f 3f", "in_position", "in_euler") if eulers else ("16f", "in_model")
+        self.vao = ctx.vertex_array(self.program, [(models, *attributes)])
+        self.visible = ctx.buffer(reserve=max(count, 1) * 64)
+        self.command = np.array([vertices, 0, 0, 0, 0], dtype=COMMAND_DTYPE)
+        self.indirect = ctx.buffer(self.command)
+
+    def cull(self, view, projection, count: Optional[int] = None) -> None:
+        """Fill :attr:`visible` and the draw command with the first ``count`` instances inside the frustum."""
+        self.program["planes"].write(culling.frustum_planes(view, projection))
+        # only the instance count is reset, the GPU counts from there
+        self.indirect.write(self.command[1:2], offset=4)
+        self.indirect.bind_to_storage_buffer(0)
+        self.vao.transform(self.visible, moderngl.POINTS, vertices=self.count if count is None else count)
+        # the shader wrote the command through a storage buffer, make it visible to the indirect draw
+        self.ctx.memory_barrier(moderngl.COMMAND_BARRIER_BIT)
+
+    def render(self, vao: moderngl.VertexArray, mode: int = moderngl.TRIANGLES) -> None:
+        """Draw ``vao``, whose instance attributes come from :attr:`visible`, with the culled instance count."""
+        vao.render_indirect(self.indirect, mode, count=1)
+
+    def visible_count(self) -> int:
+        """Number of instances kept by the last :meth:`cull`. Reading it back waits for the GPU."""
+        return int(np.frombuffer(self.indirect.read(4, offset=4), dtype=COMMAND_DTYPE)[0])
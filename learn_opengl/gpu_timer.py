@@ -0,0 +1,132 @@
+"""GPU timings of named render passes with ``ctx.query(time=True)``.
+
+Reading a query result right after the pass would wait for the GPU to catch
+up with the CPU. Instead every frame gets its own set of queries out of
+``latency`` rotating slots and a slot is only read when it comes round again,
+``latency - 1`` frames later, when its results are long available::
+
+    timer = GpuTimer(ctx)
+    while not window.is_closing:
+        with timer.scope("cubes"):
+            vao.render(moderngl.TRIANGLES, instances=len(models))
+        with timer.scope("quad"):
+            quad_fs.render(prog)
+        window.swap_buffers()
+        timer.end_frame()
+    timer.log_stats()
+
+Scopes cannot be nested (an OpenGL restriction on time-elapsed queries); a
+name used several times in one frame is summed for that frame.
+
+Software rasterizers such as Mesa llvmpipe only execute the queued draws when
+the command stream is flushed, so passes there report close to zero and the
+CPU frame time is the number to look at.
+"""
+import contextlib
+import logging
+from collections import defaultdict, deque
+from typing import Deque, Dict
+
+import moderngl
+
+from learn_opengl.stats import summarize
+
+logger = logging.getLogger(__name__)
+
+
+class GpuTimer:
+    """Rolling per-pass GPU time statistics for one context.
+
+    :param latency: number of frames in flight, results are read
+        ``latency - 1`` frames after they were issued.
+    :param history: number of per-frame samples kept for each pass.
+    :param enabled: a disabled timer issues no queries and costs next to nothing,
+        so instrumentation can stay in the render loop.
+    """
+
+    def __init__(self, ctx: moderngl.Context, latency: int = 3, history: int = 300, enabled: bool = True):
+        self.ctx = ctx
+        self.latency = max(2, latency)
+        self.enabled = enabled
+        self.samples: Dict[str, Deque[float]] = defaultdict(lambda: deque(maxlen=history))
+        self._pools = [[] for _ in range(self.latency)]
+        self._issued = [[] for _ in range(self.latency)]
+        self._slot = 0
+        self._active = None
+
+    @contextlib.contextmanager
+    def scope(self, name: str):
+        """Time the GL commands issued inside the ``with`` block as pass ``name``."""
+        if not self.enabled:
+            yield
+            return
+        if self._active is not None:
+            raise RuntimeError(f"GPU timer scope {name!r} nested in {self._active!r}")
+        issued = self._issued[self._slot]
+        pool = self._pools[self._slot]
+        if len(issued) < len(pool):
+            query = pool[len(issued)]
+        else:
+            query = self.ctx.query(time=True)
+            pool.append(query)
+
+        self._active = name
+        try:
+            with query:
+                yield
+        finally:
+            self._active = None
+            issued.append((name, query))
+
+    def end_frame(self) -> None:
+        """Advance to the next slot, collecting the results it still holds."""
+        if not self.enabled:
+            return
+        self._slot = (self._slot + 1) % self.latency
+        self._collect(self._slot)
+
+    def flush(self) -> None:
+        """Collect every outstanding result. This waits for the GPU."""
+        for offset in range(1, self.latency + 1):
+            self._collect((self._slot + offset) % self.latency)
+
+    def _collect(self, slot: int) -> None:
+        totals: Dict[str, int] = {}
+        for name, query in self._issued[slot]:
+            totals[name] = totals.get(name, 0) + query.elapsed
+        for name, elapsed in totals.items():
+            self.samples[name].append(elapsed / 1e9)
+        self._issued[slot].clear()
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Summary of the recorded samples per pass, in milliseconds."""
+        return {name: summarize(samples) for name, samples in self.samples.items()}
+
+    def log_stats(self, level: int = logging.INFO) -> None:
+        for name, stats in self.stats().items():
+            logger.log(
+                level,
+                "GPU %s: p50 %.3fms p95 %.3fms p99 %.3fms over %d frames",
+                name, stats["p50"], stats["p95"], stats["p99"], stats["count"],
+            )
+
+    @contextlib.contextmanager
+    def instrument_draws(self, name: str = "draw"):
+        """Time every ``VertexArray.render`` call issued in the block as pass ``name``.
+
+        Lets the scenes be timed without touching their render loops. The
+        ``moderngl_window`` geometry helpers such as ``quad_fs`` render through
+        ``VertexArray.render`` as well.
+        """
+        original = moderngl.VertexArray.render
+        timer = self
+
+        def render(vao, *args, **kwargs):
+            with timer.scope(name):
+                return original(vao, *args, **kwargs)
+
+        moderngl.VertexArray.render = render
+        try:
+            yield self
+        finally:
+            moderngl.VertexArray.render = original
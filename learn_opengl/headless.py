@@ -0,0 +1,469 @@
+"""Run any lesson offscreen, without a display or a GPU.
+
+Lessons open a real window either through
+``moderngl_window.create_window_from_settings()`` (the ``while not
+window.is_closing`` loop lessons) or ``moderngl_window.run_window_config()``
+(the ``WindowConfig`` lessons). While a lesson runs under :func:`run_lesson`
+both entry points are swapped for versions that create a :class:`HeadlessWindow`
+on a standalone context (EGL by default, which is what Mesa llvmpipe offers on
+a box without X), render a fixed number of frames at a chosen size and then
+close the window, so the lesson's own loop ends by itself.
+
+    python -m learn_opengl.headless 021-cube-textures-more-cubes.py --frames 120 --size 640x360
+    python -m learn_opengl.headless --output frames/  # every lesson, last frame saved as PNG
+    python -m learn_opengl.headless 024-camera-view.py --capture frames/  # every frame saved as PNG
+
+Captured frames are read back asynchronously through :class:`AsyncReadback`,
+so a frame is handed out a couple of swaps after it was drawn. With ``--fps``
+the lesson runs on a :class:`VirtualTimer` instead of the wall clock, every
+frame exactly ``1 / fps`` seconds after the previous one however long it took
+to render, which is what a recording needs.
+"""
+import argparse
+import contextlib
+import os
+import runpy
+import sys
+import weakref
+from dataclasses import dataclass, field
+from pathlib import Path
+from time import perf_counter
+from typing import Callable, Dict, List, Optional, Tuple
+
+import moderngl
+import moderngl_window
+import numpy as np
+from moderngl_window.conf import settings
+from moderngl_window.context.headless import Window
+import moderngl_window.timers.clock
+from moderngl_window.timers.base import BaseTimer
+from moderngl_window.timers.clock import Timer
+from PIL import Image
+
+from learn_opengl import startup, textures
+from learn_opengl.gpu_timer import GpuTimer
+from learn_opengl.readback import AsyncReadback, read_pixels
+from learn_opengl.stats import summarize
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+class VirtualTimer(BaseTimer):
+    """Drop-in ``Timer`` whose time is the number of :meth:`advance` calls over ``fps``."""
+
+    def __init__(self, fps: float = 60.0, **kwargs):
+        self.fps = fps
+        self.frame = 0
+        self._last_frame = 0.0
+        self._running = False
+
+    @property
+    def is_paused(self) -> bool:
+        return not self._running
+
+    @property
+    def is_running(self) -> bool:
+        return self._running
+
+    @property
+    def time(self) -> float:
+        return self.frame / self.fps
+
+    @time.setter
+    def time(self, value: float):
+        self.frame = round(max(value, 0.0) * self.fps)
+
+    def advance(self) -> None:
+        """Move on to the next frame, unless paused."""
+        if self._running:
+            self.frame += 1
+
+    def next_frame(self) -> Tuple[float, float]:
+        current = self.time
+        delta, self._last_frame = current - self._last_frame, current
+        return current, delta
+
+    def start(self):
+        self._running = True
+
+    def pause(self):
+        self._running = False
+
+    def toggle_pause(self):
+        self._running = not self._running
+
+    def stop(self) -> Tuple[float, float]:
+        self._running = False
+        return self.time, self.time
+
+
+class HeadlessWindow(Window):
+    """Headless window that closes itself after ``max_frames`` swaps.
+
+    Records the wall time between consecutive ``swap_buffers()`` calls in
+    ``frame_times`` (seconds). The headless window finishes the GL command
+    stream on every swap, so these include the time the GPU spent on the frame.
+
+    With ``capture`` set, every frame is queued for readback before the swap
+    and ``capture(index, pixels)`` is called once its pixels have arrived;
+    :meth:`flush_capture` hands out the frames still in flight. Each swap also
+    advances the :class:`VirtualTimer` objects in ``timers``.
+    """
+
+    def __init__(self, max_frames: Optional[int] = None, ctx: Optional[moderngl.Context] = None, **kwargs):
+        # an existing context to render into instead of creating one, see init_mgl_context
+        self._shared_ctx = ctx
+        super().__init__(**kwargs)
+        self.max_frames = max_frames
+        self.frame_times: List[float] = []
+        self.gpu_timer: Optional[GpuTimer] = None
+        self.capture: Optional[Callable[[int, np.ndarray], None]] = None
+        self.readback: Optional[AsyncReadback] = None
+        self.timers: List[VirtualTimer] = []
+        self._last_swap = perf_counter()
+
+    def init_mgl_context(self) -> None:
+        if self._shared_ctx is None:
+            super().init_mgl_context()
+            return
+        self._ctx = self._shared_ctx
+        self._create_fbo()
+        self.use()
+
+    def destroy(self) -> None:
+        if self._shared_ctx is None:
+            super().destroy()
+            return
+        for attachment in (*self._fbo.color_attachments, self._fbo.depth_attachment):
+            attachment.release()
+        self._fbo.release()
+
+    def swap_buffers(self) -> None:
+        if self.capture is not None:
+            if self.readback is None:
+                self.readback = AsyncReadback(self.ctx, self.fbo.size)
+            done = self.readback.push(self.fbo)
+            if done is not None:
+                self.capture(*done)
+        super().swap_buffers()
+        for timer in self.timers:
+            timer.advance()
+        if self.gpu_timer is not None:
+            self.gpu_timer.end_frame()
+        now = perf_counter()
+        self.frame_times.append(now - self._last_swap)
+        self._last_swap = now
+        if self.max_frames is not None and self.frames >= self.max_frames:
+            self.close()
+
+    def flush_capture(self) -> None:
+        if self.readback is not None:
+            for index, pixels in self.readback.drain():
+                self.capture(index, pixels)
+            self.readback.release()
+            self.readback = None
+
+    def read_image(self) -> Image.Image:
+        """The current content of the window framebuffer."""
+        return Image.fromarray(read_pixels(self.fbo), "RGBA")
+
+
+@dataclass
+class LessonRun:
+    """Outcome of one :func:`run_lesson` call."""
+
+    path: Path
+    size: Tuple[int, int]
+    frames: int = 0
+    wall_time: float = 0.0
+    frame_times: List[float] = field(default_factory=list)
+    image: Optional[Image.Image] = None
+    renderer: str = ""
+    gpu_times: Dict[str, List[float]] = field(default_factory=dict)
+
+
+def _bindless_fallback(ctx: moderngl.Context):
+    """Lessons bind textures with ``prog[...].handle = texture.get_handle()``.
+
+    llvmpipe has no ``GL_ARB_bindless_texture``: the handle is 0 and setting it
+    is ignored. Binding the texture to unit 0, which is where an unset
+    ``sampler2D`` uniform points, renders the single-texture lessons correctly.
+    """
+    if "GL_ARB_bindless_texture" in ctx.extensions:
+        return contextlib.nullcontext()
+    original = moderngl.Texture.get_handle
+
+    def get_handle(texture, resident=True):
+        texture.use(location=0)
+        return original(texture, resident)
+
+    return _patched(moderngl.Texture, "get_handle", get_handle)
+
+
+def reset_state(ctx: moderngl.Context, texture_units: int = 16) -> None:
+    """Put back the context state lessons change, for the next lesson sharing ``ctx``.
+
+    Capabilities, face culling and winding, blending, depth function, point
+    size and wireframe go back to their defaults, and sampler objects are
+    unbound from the first ``texture_units`` units (011 binds one to unit 0).
+    """
+    ctx.enable_only(moderngl.NOTHING)
+    ctx.front_face = "ccw"
+    ctx.cull_face = "back"
+    ctx.wireframe = False
+    ctx.point_size = 1.0
+    ctx.depth_func = "<"
+    ctx.blend_func = moderngl.ONE, moderngl.ZERO
+    ctx.blend_equation = moderngl.FUNC_ADD
+    sampler = ctx.sampler()
+    for unit in range(texture_units):
+        sampler.clear(unit)
+    sampler.release()
+
+
+@contextlib.contextmanager
+def _restored(mapping: dict):
+    saved = dict(mapping)
+    try:
+        yield
+    finally:
+        mapping.clear()
+        mapping.update(saved)
+
+
+@contextlib.contextmanager
+def _patched(owner, name, value):
+    original = getattr(owner, name)
+    setattr(owner, name, value)
+    try:
+        yield
+    finally:
+        setattr(owner, name, original)
+
+
+@contextlib.contextmanager
+def _working_dir(path: Path):
+    # lessons load "./textures/..." relative to the repository root
+    cwd = os.getcwd()
+    os.chdir(path)
+    sys.path.insert(0, str(path))
+    try:
+        yield
+    finally:
+        sys.path.remove(str(path))
+        os.chdir(cwd)
+
+
+def run_lesson(
+    path,
+    frames: int = 60,
+    size: Tuple[int, int] = (1280, 720),
+    backend: Optional[str] = "egl",
+    keep_image: bool = False,
+    gpu_timing: bool = False,
+    capture: Optional[Callable[[int, np.ndarray], None]] = None,
+    fps: Optional[float] = None,
+    ctx: Optional[moderngl.Context] = None,
+    sampling: Optional[Dict[str, object]] = None,
+) -> LessonRun:
+    """Run the lesson script at ``path`` offscreen for ``frames`` frames.
+
+    :param size: framebuffer size, overrides the size the lesson asks for.
+    :param backend: ``glcontext`` backend for the standalone context, ``None``
+        for the platform default.
+    :param keep_image: read the last frame back into ``LessonRun.image``.
+    :param gpu_timing: time the lesson's draw calls on the GPU, per frame, into
+        ``LessonRun.gpu_times`` (see ``GpuTimer.instrument_draws``).
+    :param capture: called with ``(frame index, pixels)`` for every frame of a
+        window, pixels being a ``(height, width, 4)`` uint8 array, top row first.
+    :param fps: run the lesson's ``Timer`` objects on a virtual clock that moves
+        ``1 / fps`` seconds per frame.
+    :param ctx: standalone context to run the lesson in, shared with other runs,
+        instead of a new one. Its state is reset with :func:`reset_state` first
+        and it is left open afterwards.
+    :param sampling: :data:`learn_opengl.textures.SAMPLING` overrides for the
+        textures the lesson loads, e.g. ``{"anisotropy": 8.0}``.
+    """
+    path = Path(path).resolve()
+    run = LessonRun(path=path, size=tuple(size))
+    stack = contextlib.ExitStack()
+    contexts = []
+    windows = []
+    timers = []
+
+    def finish(window: HeadlessWindow):
+        window.flush_capture()
+        run.frames = window.frames
+        run.frame_times = list(window.frame_times)
+        run.renderer = window.ctx.info["GL_RENDERER"]
+        if window.gpu_timer is not None:
+            window.gpu_timer.flush()
+            run.gpu_times = {name: list(samples) for name, samples in window.gpu_timer.samples.items()}
+        if keep_image:
+            run.image = window.read_image()
+
+    def open_window(**kwargs) -> HeadlessWindow:
+        kwargs.update(size=tuple(size), backend=backend, max_frames=frames, ctx=ctx)
+        window = HeadlessWindow(**kwargs)
+        windows.append(window)
+        textures.set_sampling(window.ctx, **(sampling or {}))
+        # deferred work runs after this window's first frame in the lazy startup mode
+        startup.watch(window)
+        stack.enter_context(_bindless_fallback(window.ctx))
+        if gpu_timing:
+            # keep a sample of every frame, callers slice off their warm-up themselves
+            window.gpu_timer = stack.enter_context(GpuTimer(window.ctx, history=max(frames, 1)).instrument_draws())
+        window.capture = capture
+        # timers created before the window still follow its frames
+        window.timers = timers
+        return window
+
+    def create_window_from_settings() -> HeadlessWindow:
+        window_settings = dict(settings.WINDOW)
+        window_settings.pop("class", None)
+        window = open_window(**window_settings)
+        moderngl_window.activate_context(window=window)
+        # the lesson loop only checks ``is_closing``, collect results on close
+        window.close_func = lambda: finish(window)
+        return window
+
+    def run_window_config(config_cls, timer=None, args=None) -> None:
+        # mirrors moderngl_window.run_window_config minus argument parsing
+        window = open_window(
+            title=config_cls.title,
+            gl_version=config_cls.gl_version,
+            aspect_ratio=config_cls.aspect_ratio,
+            samples=config_cls.samples,
+            cursor=True,
+        )
+        moderngl_window.activate_context(window=window)
+        timer = timer or make_timer()
+        config = config_cls(ctx=window.ctx, wnd=window, timer=timer)
+        window._config = weakref.ref(config)
+        window.set_default_viewport()
+
+        timer.start()
+        while not window.is_closing:
+            current_time, delta = timer.next_frame()
+            if config.clear_color is not None:
+                window.clear(*config.clear_color)
+            window.use()
+            window.render(current_time, delta)
+            window.swap_buffers()
+        timer.stop()
+        finish(window)
+
+    def make_timer(**kwargs) -> BaseTimer:
+        if fps is None:
+            return Timer(**kwargs)
+        timer = VirtualTimer(fps)
+        timers.append(timer)
+        return timer
+
+    def create_standalone_context(*args, **kwargs) -> moderngl.Context:
+        # 001 renders into its own standalone context
+        if ctx is not None:
+            stack.enter_context(_bindless_fallback(ctx))
+            return ctx
+        if backend:
+            kwargs.setdefault("backend", backend)
+        standalone = original_create_standalone_context(*args, **kwargs)
+        contexts.append(standalone)
+        textures.set_sampling(standalone, **(sampling or {}))
+        stack.enter_context(_bindless_fallback(standalone))
+        return standalone
+
+    def show(viewer, image, **options):
+        # 001 shows its single frame in an image viewer
+        run.frames = 1
+        run.image = image if keep_image else None
+        return 1
+
+    original_create_standalone_context = moderngl.create_standalone_context
+    if ctx is not None:
+        reset_state(ctx)
+        textures.set_sampling(ctx, **(sampling or {}))
+    with stack:
+        stack.enter_context(_working_dir(path.parent))
+        # lessons write their window size and title into the global settings
+        stack.enter_context(_restored(settings.WINDOW))
+        stack.enter_context(_patched(moderngl_window, "create_window_from_settings", create_window_from_settings))
+        stack.enter_context(_patched(moderngl_window, "run_window_config", run_window_config))
+        stack.enter_context(_patched(moderngl, "create_standalone_context", create_standalone_context))
+        if "ImageShow" in path.read_text():
+            # importing PIL.ImageShow imports IPython when it is installed, close to half
+            # a second, so only lessons that show images in a viewer pay for it
+            from PIL import ImageShow
+
+            stack.enter_context(_patched(ImageShow.Viewer, "show", show))
+        if fps is not None:
+            # lessons do ``from moderngl_window.timers.clock import Timer`` when they run
+            stack.enter_context(_patched(moderngl_window.timers.clock, "Timer", make_timer))
+        start = perf_counter()
+        try:
+            runpy.run_path(str(path), run_name="__main__")
+            run.wall_time = perf_counter() - start
+        finally:
+            # lessons never release their window or context, don't pile them up across runs
+            for window in windows:
+                window.destroy()
+            for standalone in contexts:
+                standalone.release()
+    return run
+
+
+def lesson_paths(root: Path = ROOT) -> List[Path]:
+    """All lesson scripts (``NNN-*.py``) in lesson order."""
+    return sorted(root.glob("[0-9][0-9][0-9]-*.py"))
+
+
+def parse_size(value: str) -> Tuple[int, int]:
+    width, height = value.lower().split("x")
+    return int(width), int(height)
+
+
+def save_frames(directory: Path) -> Callable[[int, np.ndarray], None]:
+    """A ``capture`` callback of :func:`run_lesson` writing frames to ``directory/NNNNN.png``."""
+    directory.mkdir(parents=True, exist_ok=True)
+
+    def capture(index: int, pixels: np.ndarray) -> None:
+        Image.fromarray(pixels, "RGBA").save(directory / f"{index:05d}.png")
+
+    return capture
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("lessons", nargs="*", type=Path, help="lesson scripts, all lessons by default")
+    parser.add_argument("--frames", type=int, default=60)
+    parser.add_argument("--size", type=parse_size, default=(1280, 720), help="WIDTHxHEIGHT")
+    parser.add_argument("--backend", default="egl", help='glcontext backend, "" for the platform default')
+    parser.add_argument("--output", type=Path, help="directory to save the last frame of each lesson to")
+    parser.add_argument("--gpu-timing", action="store_true", help="report GPU time spent in draw calls")
+    parser.add_argument("--capture", type=Path, help="directory to save every frame of each lesson to")
+    parser.add_argument("--fps", type=float, help="run lessons on a virtual clock at this frame rate")
+    args = parser.parse_args()
+
+    if args.output:
+        args.output.mkdir(parents=True, exist_ok=True)
+    for path in args.lessons or lesson_paths():
+        run = run_lesson(
+            path,
+            args.frames,
+            args.size,
+            args.backend or None,
+            keep_image=args.output is not None,
+            gpu_timing=args.gpu_timing,
+            capture=save_frames(args.capture / path.stem) if args.capture else None,
+            fps=args.fps,
+        )
+        print(f"{path.name:<52} {run.frames:>5} frames {run.wall_time:>8.3f}s")
+        for name, samples in run.gpu_times.items():
+            gpu = summarize(samples)
+            print(f"    GPU {name}: p50 {gpu['p50']:.3f}ms p95 {gpu['p95']:.3f}ms p99 {gpu['p99']:.3f}ms")
+        if args.output and run.image is not None:
+            run.image.save(args.output / f"{path.stem}.png")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""Run lessons one after the other in a single process and a single GL context.
+
+Starting every lesson as ``python 0NN-*.py`` pays for the interpreter, the
+imports and a new context each time. The launcher pays once: it creates one
+standalone context, runs each lesson in it headless through
+:func:`learn_opengl.headless.run_lesson` (the lesson script executed as a
+module), and keeps compiled programs and uploaded textures between lessons::
+
+    python -m learn_opengl                      # every lesson, 3 frames each
+    learn-opengl 21 22 23 --frames 120          # the installed entry point
+    learn-opengl --output frames/ --reference reference/   # regression check
+
+Programs are deduplicated by source in the context's
+:class:`learn_opengl.programs.ProgramRegistry`, whether a lesson loads them
+from it or links them with an inline ``ctx.program(...)``; textures through
+:func:`learn_opengl.textures.share_textures`. The context state a
+lesson changes is reset before the next one starts, and its other GL objects
+are released by the garbage collector (``ctx.gc_mode = "auto"``).
+"""
+import argparse
+import contextlib
+import sys
+from pathlib import Path
+from time import perf_counter
+from typing import Iterator, List, Optional, Tuple
+
+import moderngl
+import numpy as np
+from PIL import Image
+
+from learn_opengl import headless, programs, textures
+
+# ctx.program arguments ProgramRegistry.program takes as well
+_REGISTRY_ARGUMENTS = {"vertex_shader", "fragment_shader", "geometry_shader", "varyings"}
+
+
+def find_lessons(names: List[str], root: Path = headless.ROOT) -> List[Path]:
+    """Lesson scripts for ``names``: numbers (``7``, ``021``), file names or paths; all lessons without names."""
+    lessons = headless.lesson_paths(root)
+    if not names:
+        return lessons
+    paths = []
+    for name in names:
+        if name.isdigit():
+            matches = [path for path in lessons if path.name.startswith(f"{int(name):03d}-")]
+        else:
+            matches = [path for path in lessons if path.name == Path(name).name]
+            matches = matches or ([Path(name).resolve()] if Path(name).is_file() else [])
+        if not matches:
+            raise SystemExit(f"no lesson {name!r} in {root}")
+        paths.extend(matches)
+    return paths
+
+
+@contextlib.contextmanager
+def shared_programs(ctx: moderngl.Context):
+    """While active, inline ``ctx.program(...)`` calls go through :func:`learn_opengl.programs.registry` of ``ctx``.
+
+    A program linked from the same sources before, by any lesson, is handed
+    out again. Calls with arguments the registry does not take reach
+    ``moderngl`` unchanged.
+    """
+    original = moderngl.Context.program
+    registry = programs.registry(ctx)
+    # the registry links through ctx.program itself
+    linking = []
+
+    def program(self, *args, **kwargs):
+        if self is not ctx or args or linking or not set(kwargs) <= _REGISTRY_ARGUMENTS:
+            return original(self, *args, **kwargs)
+        linking.append(True)
+        try:
+            return registry.program(**kwargs)
+        finally:
+            linking.pop()
+
+    moderngl.Context.program = program
+    try:
+        yield registry
+    finally:
+        moderngl.Context.program = original
+
+
+def compare(image: Image.Image, reference: Path) -> Optional[int]:
+    """Largest per-channel difference between ``image`` and the PNG at ``reference``; ``None`` without one."""
+    if not reference.exists():
+        return None
+    expected = np.asarray(Image.open(reference).convert(image.mode), dtype=np.int16)
+    actual = np.asarray(image, dtype=np.int16)
+    if expected.shape != actual.shape:
+        return 255
+    return int(np.abs(expected - actual).max())
+
+
+def run_lessons(
+    paths: List[Path],
+    frames: int = 3,
+    size: Tuple[int, int] = (1280, 720),
+    backend: Optional[str] = "egl",
+    keep_image: bool = False,
+    fps: Optional[float] = 60.0,
+) -> Iterator[headless.LessonRun]:
+    """Run ``paths`` in order in one shared standalone context, yielding each run as it ends.
+
+    :param fps: virtual clock of the animated lessons, so that frames are
+        reproducible; ``None`` runs them on the wall clock.
+    """
+    kwargs = {"backend": backend} if backend else {}
+    ctx = moderngl.create_standalone_context(**kwargs)
+    ctx.gc_mode = "auto"
+    textures.share_textures(ctx)
+    # builds every program variant up front, before the first lesson
+    programs.registry(ctx).precompile()
+    try:
+        with shared_programs(ctx):
+            for path in paths:
+                yield headless.run_lesson(path, frames, size, backend, keep_image=keep_image, fps=fps, ctx=ctx)
+    finally:
+        ctx.release()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("lessons", nargs="*", help="lesson numbers, file names or paths, all lessons by default")
+    parser.add_argument("--frames", type=int, default=3, help="frames rendered per lesson")
+    parser.add_argument("--fps", type=float, default=60.0, help="virtual clock rate, 0 for the wall clock")
+    parser.add_argument("--size", type=headless.parse_size, default=(1280, 720), help="WIDTHxHEIGHT")
+    parser.add_argument("--backend", default="egl", help='glcontext backend, "" for the platform default')
+    parser.add_argument("--output", type=Path, help="directory to save the last frame of each lesson to")
+    parser.add_argument("--reference", type=Path, help="directory of PNGs the last frames must match")
+    parser.add_argument("--tolerance", type=int, default=2, help="largest allowed per-channel difference")
+    args = parser.parse_args()
+
+    paths = find_lessons(args.lessons)
+    if args.output:
+        args.output.mkdir(parents=True, exist_ok=True)
+    keep_image = bool(args.output or args.reference)
+    failures = []
+    start = perf_counter()
+    for run in run_lessons(paths, args.frames, args.size, args.backend or None, keep_image, args.fps or None):
+        line = f"{run.path.name:<52} {run.frames:>5} frames {run.wall_time:>8.3f}s"
+        if args.output and run.image is not None:
+            run.image.save(args.output / f"{run.path.stem}.png")
+        if args.reference and run.image is not None:
+            difference = compare(run.image, args.reference / f"{run.path.stem}.png")
+            line += "  no reference" if difference is None else f"  max diff {difference}"
+            if difference is not None and difference > args.tolerance:
+                failures.append(run.path.name)
+        print(line)
+    print(f"{len(paths)} lessons in {perf_counter() - start:.3f}s")
+    if failures:
+        print(f"{len(failures)} lessons differ from the reference: {', '.join(failures)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""Shader library and a compile-once program registry per context.
+
+Shader sources live in ``learn_opengl/shaders/*.glsl``, one file per program,
+with the stages separated the same way ``moderngl_window`` single-file
+programs are::
+
+    #version 330 core
+    #if defined VERTEX_SHADER
+    ...
+    #elif defined FRAGMENT_SHADER
+    ...
+    #endif
+
+Variants are selected with ``#define``s, injected right after ``#version``
+together with the stage define. Programs are keyed by a hash of their final
+sources, so asking twice for the same variant, or for the same embedded
+strings from two lessons, links a single program::
+
+    programs = registry(ctx)
+    prog = programs.load("textured_cube", defines={"INSTANCED": 1})
+
+Uniform blocks listed in :data:`learn_opengl.uniforms.BLOCK_BINDINGS`, such
+as the shared ``Camera`` block, are bound to their fixed binding points.
+
+Compile and link times are logged and kept in ``ProgramRegistry.timings``.
+Under a software rasterizer they are long enough to cause visible hitches,
+hence :meth:`ProgramRegistry.precompile`, which builds every variant in
+:data:`VARIANTS` that the context's GL version supports. Callers that go on to
+draw with many variants call it, as ``python -m learn_opengl`` does before its
+first lesson; a single lesson only compiles what it loads.
+"""
+import functools
+import hashlib
+import logging
+import re
+from pathlib import Path
+from time import perf_counter
+from typing import Dict, Iterable, Mapping, Optional, Sequence, Tuple
+
+import moderngl
+
+from learn_opengl import uniforms
+
+logger = logging.getLogger(__name__)
+
+SHADER_DIR = Path(__file__).resolve().parent / "shaders"
+
+STAGES = ("VERTEX_SHADER", "GEOMETRY_SHADER", "FRAGMENT_SHADER")
+
+#: Every ``(name, defines, varyings)`` program variant in use, built by ``precompile()``.
+VARIANTS: Sequence[Tuple[str, Optional[Mapping[str, object]], Sequence[str]]] = (
+    ("textured_cube", None, ()),
+    ("textured_cube", {"INSTANCED": 1}, ()),
+    ("textured_cube", {"TEXTURE_ARRAY": 1}, ()),
+    ("textured_cube", {"INSTANCED": 1, "TEXTURE_ARRAY": 1}, ()),
+    ("cull_instances", None, ("out_model",)),
+    ("cull_instances", {"EULERS": 1}, ("out_model",)),
+)
+
+
+@functools.lru_cache(maxsize=None)
+def source(name: str) -> str:
+    """Raw source of ``shaders/<name>.glsl``."""
+    return (SHADER_DIR / f"{name}.glsl").read_text()
+
+
+def version(name: str) -> int:
+    """GLSL version of ``shaders/<name>.glsl``, e.g. ``330``."""
+    match = re.match(r"\s*#version\s+(\d+)", source(name))
+    if match is None:
+        raise ValueError(f"{name}.glsl must start with a #version directive")
+    return int(match.group(1))
+
+
+def preprocess(text: str, defines: Optional[Mapping[str, object]] = None) -> str:
+    """Insert ``#define`` lines right after the ``#version`` directive."""
+    lines = [f"#define {key} {value}" for key, value in (defines or {}).items()]
+    if not lines:
+        return text
+    head, newline, rest = text.lstrip().partition("\n")
+    if not head.startswith("#version"):
+        raise ValueError("shader source must start with a #version directive")
+    return "\n".join([head, *lines, rest])
+
+
+def stages(text: str, defines: Optional[Mapping[str, object]] = None) -> Dict[str, str]:
+    """Split a single-file program into per-stage sources (``vertex_shader=...`` keys)."""
+    return {
+        stage.lower(): preprocess(text, {stage: 1, **(defines or {})})
+        for stage in STAGES
+        if f"defined {stage}" in text or f"#ifdef {stage}" in text
+    }
+
+
+class ProgramRegistry:
+    """Programs of one context, deduplicated by source hash."""
+
+    def __init__(self, ctx: moderngl.Context):
+        self.ctx = ctx
+        self.programs: Dict[str, moderngl.Program] = {}
+        #: label -> compile + link time in seconds
+        self.timings: Dict[str, float] = {}
+
+    def program(
+        self,
+        vertex_shader: str,
+        fragment_shader: Optional[str] = None,
+        geometry_shader: Optional[str] = None,
+        varyings: Sequence[str] = (),
+        label: Optional[str] = None,
+    ) -> moderngl.Program:
+        """Same arguments as ``ctx.program``; returns the cached program if it was built already."""
+        key = hashlib.sha1(
+            "\0".join([vertex_shader, fragment_shader or "", geometry_shader or "", *varyings]).encode()
+        ).hexdigest()
+        prog = self.programs.get(key)
+        if prog is not None:
+            return prog
+
+        label = label or key[:12]
+        start = perf_counter()
+        prog = self.ctx.program(
+            vertex_shader=vertex_shader,
+            fragment_shader=fragment_shader,
+            geometry_shader=geometry_shader,
+            varyings=varyings,
+        )
+        elapsed = perf_counter() - start
+        for block, binding in uniforms.BLOCK_BINDINGS.items():
+            if block in prog:
+                prog[block].binding = binding
+        self.timings[label] = elapsed
+        logger.info("compiled and linked program %s in %.2fms", label, elapsed * 1e3)
+        self.programs[key] = prog
+        return prog
+
+    def load(
+        self,
+        name: str,
+        defines: Optional[Mapping[str, object]] = None,
+        varyings: Sequence[str] = (),
+    ) -> moderngl.Program:
+        """Program built from ``shaders/<name>.glsl`` with the given ``defines``."""
+        return self.program(**stages(source(name), defines), varyings=varyings, label=variant_label(name, defines))
+
+    def precompile(
+        self, variants: Iterable[Tuple[str, Optional[Mapping[str, object]], Sequence[str]]] = VARIANTS
+    ) -> None:
+        """Build the given ``(name, defines, varyings)`` variants now rather than on first use.
+
+        Variants needing a newer GLSL version than the context offers are skipped.
+        """
+        variants = [variant for variant in variants if version(variant[0]) <= self.ctx.version_code]
+        start = perf_counter()
+        for name, defines, varyings in variants:
+            self.load(name, defines, varyings)
+        logger.info("precompiled %d programs in %.2fms", len(variants), (perf_counter() - start) * 1e3)
+
+
+def variant_label(name: str, defines: Optional[Mapping[str, object]] = None) -> str:
+    if not defines:
+        return name
+    return name + "[" + ",".join(f"{key}={value}" for key, value in defines.items()) + "]"
+
+
+def registry(ctx: moderngl.Context) -> ProgramRegistry:
+    """The program registry of ``ctx``, created on first use and kept in ``ctx.extra``."""
+    if ctx.extra is None:
+        ctx.extra = {}
+    programs = ctx.extra.get(__name__)
+    if programs is None:
+        programs = ctx.extra[__name__] = ProgramRegistry(ctx)
+    return programs
@@ -0,0 +1,159 @@
+"""Streaming framebuffer readback through a ring of pixel pack buffers.
+
+``fbo.read()`` returns only once the GPU has finished everything queued so
+far, so reading every frame of an animation serializes CPU and GPU.
+``fbo.read_into(buffer)`` with a ``moderngl.Buffer`` target instead queues a
+copy into that buffer (a pixel pack buffer) and returns immediately.
+:class:`AsyncReadback` rotates ``depth`` such buffers and hands back each
+frame's pixels ``depth - 1`` frames later, by which time the copy is long
+done::
+
+    readback = AsyncReadback(ctx, fbo.size, depth=3)
+    for frame in range(frames):
+        render(frame)
+        done = readback.push(fbo)                   # frame - 2, once there is one
+        if done is not None:
+            save(*done)
+    for index, pixels in readback.drain():          # the last two frames
+        save(index, pixels)
+
+Pixels come back as ``(height, width, components)`` arrays, top row first.
+The flip from OpenGL's bottom-up rows is a negative-stride view, not a copy.
+
+:func:`read_pixels` is the synchronous counterpart: the driver writes the
+framebuffer straight into a preallocated array, with no ``bytes`` object, no
+``Image.frombytes`` and no CPU flip in between::
+
+    pixels = pixel_array(fbo.size, components=3)          # once
+    frame = read_pixels(fbo, pixels)                       # every frame, top row first
+
+Consumers that need C-contiguous frames (``torch.from_numpy`` rejects negative
+strides) can have the GPU draw the image upside down instead, with
+:func:`flip_projection` and ``ctx.front_face = "cw"``, and read with
+``flip=False``.
+"""
+from collections import deque
+from typing import Deque, Iterator, Optional, Tuple
+
+import moderngl
+import numpy as np
+
+#: moderngl dtype string -> NumPy dtype of the returned pixels
+DTYPES = {"f1": np.uint8, "f2": np.float16, "f4": np.float32, "u1": np.uint8, "u2": np.uint16, "u4": np.uint32}
+
+
+def pixel_array(size: Tuple[int, int], components: int = 4, dtype=np.uint8) -> np.ndarray:
+    """Uninitialized ``(height, width, components)`` array for frames of ``size``."""
+    width, height = size
+    return np.empty((height, width, components), dtype=dtype)
+
+
+def _check_out(out: np.ndarray, shape: Tuple[int, ...], dtype) -> None:
+    if out.shape != shape or out.dtype != dtype or not out.flags.c_contiguous:
+        raise ValueError(
+            f"out must be a contiguous {np.dtype(dtype).name} array of shape {shape}, got {out.dtype.name} {out.shape}"
+        )
+
+
+def read_pixels(
+    fbo: moderngl.Framebuffer, out: Optional[np.ndarray] = None, attachment: int = 0, flip: bool = True
+) -> np.ndarray:
+    """Read the color attachment of ``fbo`` into ``out`` and return it top row first.
+
+    :param out: C-contiguous ``(height, width, components)`` uint8 or float32
+        array, see :func:`pixel_array`; components and pixel type follow from it.
+        A new RGBA uint8 array is allocated without it.
+        Four components usually read fastest, since they match the
+        framebuffer's own layout (4K on llvmpipe: 6ms RGBA, 16ms RGB).
+    :param flip: return ``out[::-1]``, a view with the rows in image order.
+        ``False`` returns ``out`` itself, in OpenGL's bottom-up order.
+    """
+    if out is None:
+        out = pixel_array(fbo.size)
+    dtype = {np.dtype(np.uint8): "f1", np.dtype(np.float32): "f4"}.get(out.dtype)
+    if dtype is None or out.ndim != 3:
+        raise ValueError(
+            f"out must be a (height, width, components) uint8 or float32 array, got {out.dtype.name} {out.shape}"
+        )
+    width, height = fbo.size
+    _check_out(out, (height, width, out.shape[2]), out.dtype)
+    fbo.read_into(out, components=out.shape[2], attachment=attachment, alignment=1, dtype=dtype)
+    return out[::-1] if flip else out
+
+
+def flip_projection(projection: np.ndarray) -> np.ndarray:
+    """``pyrr`` row-major ``projection`` that also mirrors clip space vertically.
+
+    Frames rendered with it are read back top row first; mirroring reverses the
+    winding of every triangle, so set ``ctx.front_face = "cw"`` with face culling.
+    """
+    return np.asarray(projection, dtype=np.float32) * np.array([1.0, -1.0, 1.0, 1.0], dtype=np.float32)
+
+
+class AsyncReadback:
+    """Ring of ``depth`` pack buffers for ``size`` framebuffers; ``depth=2`` is double buffering.
+
+    :param components: 3 for RGB, 4 for RGBA.
+    :param dtype: moderngl pixel type, ``"f1"`` (uint8) or ``"f4"`` (float32) for instance.
+    """
+
+    def __init__(
+        self,
+        ctx: moderngl.Context,
+        size: Tuple[int, int],
+        components: int = 4,
+        dtype: str = "f1",
+        depth: int = 3,
+        attachment: int = 0,
+    ):
+        if depth < 2:
+            raise ValueError("asynchronous readback needs at least two buffers")
+        width, height = size
+        self.size = size
+        self.components = components
+        self.dtype = dtype
+        self.attachment = attachment
+        self.shape = (height, width, components)
+        nbytes = width * height * components * np.dtype(DTYPES[dtype]).itemsize
+        self.buffers = [ctx.buffer(reserve=nbytes, dynamic=True) for _ in range(depth)]
+        #: (frame index, buffer) of the copies not handed out yet, oldest first
+        self.pending: Deque[Tuple[int, moderngl.Buffer]] = deque()
+        self.frames = 0
+
+    @property
+    def latency(self) -> int:
+        """Number of frames between a :meth:`push` and the return of its pixels."""
+        return len(self.buffers) - 1
+
+    def push(self, fbo: moderngl.Framebuffer, out: Optional[np.ndarray] = None) -> Optional[Tuple[int, np.ndarray]]:
+        """Queue the copy of ``fbo``; returns ``(index, pixels)`` of the frame ``latency`` pushes ago, if any.
+
+        :param out: optional preallocated ``(height, width, components)`` array to
+            receive the pixels, otherwise a new array is allocated per frame.
+        """
+        buffer = self.buffers[self.frames % len(self.buffers)]
+        fbo.read_into(buffer, components=self.components, attachment=self.attachment, alignment=1, dtype=self.dtype)
+        self.pending.append((self.frames, buffer))
+        self.frames += 1
+        if len(self.pending) > self.latency:
+            return self._collect(out)
+        return None
+
+    def drain(self, out: Optional[np.ndarray] = None) -> Iterator[Tuple[int, np.ndarray]]:
+        """Yield the frames still in flight, waiting for each of them."""
+        while self.pending:
+            yield self._collect(out)
+
+    def _collect(self, out: Optional[np.ndarray]) -> Tuple[int, np.ndarray]:
+        index, buffer = self.pending.popleft()
+        if out is None:
+            out = np.empty(self.shape, dtype=DTYPES[self.dtype])
+        else:
+            _check_out(out, self.shape, DTYPES[self.dtype])
+        buffer.read_into(out)
+        return index, out[::-1]
+
+    def release(self) -> None:
+        for buffer in self.buffers:
+            buffer.release()
+        self.pending.clear()
@@ -0,0 +1,92 @@
+#version 430 core
+
+// Frustum culling of per-instance model matrices, run by learn_opengl/gpu_culling.py.
+//
+// Drawn as points over the instance buffer with transform feedback: the
+// geometry shader re-emits the model matrix of every instance whose bounding
+// sphere reaches into the frustum, which packs the visible ones at the start of
+// the output buffer, and counts them in the instanceCount of the indirect draw
+// command bound as storage buffer 0.
+//
+// Variants:
+//   EULERS  the instances are static (in_position, in_euler) pairs and the model
+//           matrix is built here, as learn_opengl.transforms.from_eulers does,
+//           at the ``time`` of the Camera block
+
+#if defined VERTEX_SHADER
+
+#if defined EULERS
+in vec3 in_position;
+// roll, pitch, yaw in radians per unit of time
+in vec3 in_euler;
+// learn_opengl/uniforms.py
+layout (std140) uniform Camera
+{
+    mat4 view;
+    mat4 projection;
+    mat4 view_projection;
+    vec3 eye;
+    float time;
+};
+#else
+in mat4 in_model;
+#endif
+
+out mat4 v_model;
+
+void main()
+{
+#if defined EULERS
+    vec3 s = sin(in_euler * time);
+    vec3 c = cos(in_euler * time);
+    // one column per pyrr row: rotation, then the translation in the last one
+    v_model = mat4(
+        c.z * c.y, -c.z * s.y * c.x + s.z * s.x, c.z * s.y * s.x + s.z * c.x, 0.0,
+        s.y, c.y * c.x, -c.y * s.x, 0.0,
+        -s.z * c.y, s.z * s.y * c.x + c.z * s.x, -s.z * s.y * s.x + c.z * c.x, 0.0,
+        in_position, 1.0
+    );
+#else
+    v_model = in_model;
+#endif
+}
+
+#elif defined GEOMETRY_SHADER
+
+layout (points) in;
+layout (points, max_vertices = 1) out;
+
+// (a, b, c, d) with a*x + b*y + c*z + d the signed distance, positive inside
+uniform vec4 planes[6];
+// world-space bounding sphere radius around the model origin
+uniform float radius;
+
+layout (std430, binding = 0) buffer DrawCommand
+{
+    uint index_count;
+    uint instance_count;
+    uint first_index;
+    int base_vertex;
+    uint base_instance;
+};
+
+in mat4 v_model[];
+
+out mat4 out_model;
+
+void main()
+{
+    // the translation, last row of the pyrr matrix
+    vec3 center = v_model[0][3].xyz;
+    for (int i = 0; i < 6; ++i) {
+        if (dot(planes[i].xyz, center) + planes[i].w < -radius) {
+            return;
+        }
+    }
+    atomicAdd(instance_count, 1u);
+    out_model = v_model[0];
+    EmitVertex();
+    EndPrimitive();
+}
+
+#endif
@@ -0,0 +1,68 @@
+#version 330 core
+
+// Textured geometry in 3D, shared by the cube and camera lessons (018-028).
+//
+// Variants:
+//   INSTANCED      the model matrix is a per-instance attribute instead of a uniform
+//   TEXTURE_ARRAY  sample layer ``in_layer`` of the sampler2DArray ``ourTextures``
+//                  instead of ``ourTexture``; ``in_layer`` is per-vertex or, with a
+//                  "/i" buffer, per-instance
+
+#if defined VERTEX_SHADER
+
+in vec3 position;
+in vec2 in_texture_coords;
+
+#if defined INSTANCED
+in mat4 model;
+#else
+uniform mat4 model;
+#endif
+// learn_opengl/uniforms.py, updated once per frame for every program
+layout (std140) uniform Camera
+{
+    mat4 view;
+    mat4 projection;
+    mat4 view_projection;
+    vec3 eye;
+    float time;
+};
+
+out vec2 texture_coord;
+#if defined TEXTURE_ARRAY
+in int in_layer;
+flat out int layer;
+#endif
+
+void main()
+{
+    gl_Position = view_projection * model * vec4(position.xyz, 1.0);
+    texture_coord = in_texture_coords;
+#if defined TEXTURE_ARRAY
+    layer = in_layer;
+#endif
+}
+
+#elif defined FRAGMENT_SHADER
+
+in vec2 texture_coord;
+
+#if defined TEXTURE_ARRAY
+flat in int layer;
+uniform sampler2DArray ourTextures;
+#else
+uniform sampler2D ourTexture;
+#endif
+
+out vec4 fragemnt_color;
+
+void main()
+{
+#if defined TEXTURE_ARRAY
+    fragemnt_color = texture(ourTextures, vec3(texture_coord, layer));
+#else
+    fragemnt_color = texture(ourTexture, texture_coord);
+#endif
+}
+
+#endif
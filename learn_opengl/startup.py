@@ -0,0 +1,215 @@
+"""Time to first frame, and how to shorten it.
+
+:func:`profile_lesson` starts a lesson in a fresh interpreter, headless, and
+splits the time until its first ``swap_buffers()`` returns into
+
+* ``import``: from interpreter start to the window being requested, mostly
+  module imports (``moderngl_window`` alone pulls in numpy, PIL and its
+  geometry and scene modules),
+* ``context``: creating the window and its GL context,
+* ``shaders``: ``ctx.program`` calls, compile and link,
+* ``assets``: texture loads (decode or cache map, upload, mipmaps) and buffer
+  uploads,
+* ``other``: the rest of the lesson's setup code,
+* ``first draw``: from the first draw call to the end of the first swap::
+
+    python -m learn_opengl.startup                      # every lesson
+    python -m learn_opengl.startup 028-walk-around-camera-controls-mouse.py --runs 5
+
+With ``LEARN_OPENGL_LAZY_STARTUP=1`` in the environment (:data:`LAZY`),
+lessons that :func:`watch` their window present the first frame before doing
+work it does not need: work passed to :func:`defer`, currently texture mipmap
+generation, runs right after the first swap. The camera lessons watch their
+window, and so does :func:`learn_opengl.headless.run_lesson` for every window it
+opens. The first frame samples the base level only. Mipmap generation is the single most expensive
+setup step under llvmpipe, which compiles its blit shader on first use.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+from time import perf_counter
+from typing import TYPE_CHECKING, Callable, Dict, List
+
+if TYPE_CHECKING:
+    import moderngl
+
+# taken before anything heavy is imported, for the child processes of profile_lesson
+_START = perf_counter()
+
+ROOT = Path(__file__).resolve().parent.parent
+
+#: Startup mode: defer non-critical work until the first frame is on screen
+LAZY = os.environ.get("LEARN_OPENGL_LAZY_STARTUP", "") not in ("", "0")
+
+PHASES = ("import", "context", "shaders", "assets", "other", "first draw")
+
+
+class AfterFirstFrame:
+    """Callbacks held back until the first frame of a window has been presented."""
+
+    def __init__(self):
+        self.callbacks: List[Callable[[], None]] = []
+        #: a window of the context reports its first swap, see :func:`watch`
+        self.watching = False
+        self.done = False
+
+    def add(self, callback: Callable[[], None]) -> None:
+        if self.done:
+            callback()
+        else:
+            self.callbacks.append(callback)
+
+    def run(self) -> None:
+        self.done = True
+        callbacks, self.callbacks = self.callbacks, []
+        for callback in callbacks:
+            callback()
+
+
+def after_first_frame(ctx: "moderngl.Context") -> AfterFirstFrame:
+    """The :class:`AfterFirstFrame` queue of ``ctx``, kept in ``ctx.extra``."""
+    if ctx.extra is None:
+        ctx.extra = {}
+    queue = ctx.extra.get(__name__)
+    if queue is None:
+        queue = ctx.extra[__name__] = AfterFirstFrame()
+    return queue
+
+
+def watch(window) -> AfterFirstFrame:
+    """Run the deferred work of ``window.ctx`` right after the window's first ``swap_buffers()``."""
+    queue = after_first_frame(window.ctx)
+    queue.watching = True
+    if "swap_buffers" in vars(window):
+        # watched already
+        return queue
+    swap_buffers = window.swap_buffers
+
+    def swap_then_run():
+        swap_buffers()
+        # later frames go straight to the window's own method
+        del window.swap_buffers
+        queue.run()
+
+    window.swap_buffers = swap_then_run
+    return queue
+
+
+def defer(ctx: "moderngl.Context", callback: Callable[[], None]) -> None:
+    """Call ``callback`` after the first frame in :data:`LAZY` mode if a window of ``ctx`` is watched, else now."""
+    queue = after_first_frame(ctx)
+    if LAZY and queue.watching and not queue.done:
+        queue.add(callback)
+    else:
+        callback()
+
+
+def _measure_child(path: Path, size, backend) -> Dict[str, float]:
+    """Run the lesson at ``path`` for one frame in this process, instrumented."""
+    import moderngl
+
+    from learn_opengl import headless, textures
+
+    phases = dict.fromkeys(PHASES, 0.0)
+    marks = {}
+    depth = [0]
+
+    def timed(phase, function):
+        def wrapper(*args, **kwargs):
+            if depth[0] or "draw" in marks:
+                # nested in another timed call, or part of the first draw already
+                return function(*args, **kwargs)
+            depth[0] += 1
+            start = perf_counter()
+            marks.setdefault(phase, start)
+            try:
+                return function(*args, **kwargs)
+            finally:
+                phases[phase] += perf_counter() - start
+                depth[0] -= 1
+
+        return wrapper
+
+    def first_draw(function):
+        def wrapper(*args, **kwargs):
+            marks.setdefault("draw", perf_counter())
+            return function(*args, **kwargs)
+
+        return wrapper
+
+    def first_swap(function):
+        def wrapper(window):
+            marks.setdefault("swap", perf_counter())
+            function(window)
+            marks.setdefault("presented", perf_counter())
+
+        return wrapper
+
+    patches = [
+        (headless.HeadlessWindow, "__init__", timed("context", headless.HeadlessWindow.__init__)),
+        (headless.HeadlessWindow, "swap_buffers", first_swap(headless.HeadlessWindow.swap_buffers)),
+        (moderngl.Context, "program", timed("shaders", moderngl.Context.program)),
+        (moderngl.Context, "buffer", timed("assets", moderngl.Context.buffer)),
+        (moderngl.Context, "texture", timed("assets", moderngl.Context.texture)),
+        (moderngl.Context, "texture_array", timed("assets", moderngl.Context.texture_array)),
+        (textures, "load_texture", timed("assets", textures.load_texture)),
+        (textures, "load_texture_array", timed("assets", textures.load_texture_array)),
+        (moderngl.VertexArray, "render", first_draw(moderngl.VertexArray.render)),
+        (moderngl.VertexArray, "render_indirect", first_draw(moderngl.VertexArray.render_indirect)),
+    ]
+    for owner, name, value in patches:
+        setattr(owner, name, value)
+    headless.run_lesson(path, frames=1, size=size, backend=backend)
+
+    if "presented" not in marks:
+        raise RuntimeError(f"{path.name} never presented a frame")
+    phases["import"] = marks["context"] - _START
+    phases["first draw"] = marks["presented"] - marks.get("draw", marks["swap"])
+    phases["total"] = marks["presented"] - _START
+    phases["other"] = phases["total"] - sum(phases[phase] for phase in PHASES if phase != "other")
+    return phases
+
+
+def profile_lesson(path, size=(1280, 720), backend="egl", env=None) -> Dict[str, float]:
+    """Startup phases of the lesson at ``path`` in seconds, plus ``total``, measured in a new interpreter."""
+    command = [sys.executable, "-m", "learn_opengl.startup", "--child", str(Path(path).resolve())]
+    command += ["--size", "x".join(map(str, size)), "--backend", backend or ""]
+    result = subprocess.run(command, check=True, capture_output=True, text=True, env=env, cwd=ROOT)
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("lessons", nargs="*", type=Path, help="lesson scripts, all window lessons by default")
+    parser.add_argument("--runs", type=int, default=3, help="fresh starts per lesson, the median is shown")
+    parser.add_argument("--size", default="1280x720", help="WIDTHxHEIGHT")
+    parser.add_argument("--backend", default="egl", help='glcontext backend, "" for the platform default')
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        from learn_opengl import headless
+
+        phases = _measure_child(args.lessons[0].resolve(), headless.parse_size(args.size), args.backend or None)
+        print(json.dumps(phases))
+        return
+
+    from learn_opengl import headless
+    from learn_opengl.stats import summarize
+
+    size = headless.parse_size(args.size)
+    # 001 renders into an image viewer, not a window
+    paths = args.lessons or [path for path in headless.lesson_paths() if not path.name.startswith("001-")]
+    columns = (*PHASES, "total")
+    print(f"{'lesson (median ms)':<52}" + "".join(f"{column:>11}" for column in columns))
+    for path in paths:
+        runs = [profile_lesson(path, size, args.backend or None) for _ in range(args.runs)]
+        medians = [summarize([run[column] for run in runs])["p50"] for column in columns]
+        print(f"{path.name:<52}" + "".join(f"{median:>11.1f}" for median in medians))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""Static batching: meshes that never move relative to each other, merged into one draw.
+
+Drawing ``N`` objects one by one costs ``N`` uniform uploads, texture binds and
+draw calls every frame. When the objects stay put, their vertices can be
+transformed once on the CPU and merged into a single vertex and index buffer
+instead; a :class:`StaticBatch` then draws them all with one call::
+
+    prog = programs.registry(ctx).load("textured_cube", defines={"TEXTURE_ARRAY": 1})
+    prog["model"] = pyrr.matrix44.create_identity(dtype=np.float32).flatten()  # already in world space
+    batch = StaticBatch(ctx, prog)
+    handles = batch.extend(mesh, models, layers)   # one entry per (model matrix, texture layer)
+    batch.remove(handles[3])
+    batch.render()
+
+Every merged vertex holds its world space position, texture coordinates and
+the layer of the texture array it samples (:data:`FORMAT`). Adding an entry
+transforms only that entry's vertices and appends them; removing one moves the
+last entry into its place when both are the same size (entries of the same
+mesh), otherwise the entries after it move down. Either way only the changed
+range is uploaded and nothing is transformed again. The CPU copies and GPU
+buffers grow by doubling, the one time the whole batch is uploaded.
+
+Moving objects do not belong in a batch: changing one means removing and
+adding it again. Use instancing for those, as the cube field lessons do.
+"""
+from dataclasses import dataclass
+from typing import Dict, List, Sequence
+
+import moderngl
+import numpy as np
+
+from learn_opengl import geometry
+
+#: Vertex layout of a batch: world space position, texture coordinates and texture array layer
+FORMAT = "3f 2f 1i"
+
+
+@dataclass
+class _Entry:
+    first_vertex: int
+    vertex_count: int
+    first_index: int
+    index_count: int
+
+
+class StaticBatch:
+    """Pre-transformed meshes in one vertex and index buffer, drawn with a single call.
+
+    :param program: program the batch is drawn with; its model matrix, if any,
+        should be the identity.
+    :param attributes: names of the position, texture coordinate and, optionally,
+        integer texture layer inputs of ``program``.
+    """
+
+    def __init__(
+        self,
+        ctx: moderngl.Context,
+        program: moderngl.Program,
+        attributes: Sequence[str] = ("position", "in_texture_coords", "in_layer"),
+        vertex_capacity: int = 1024,
+        index_capacity: int = 4096,
+    ):
+        if len(attributes) not in (2, 3):
+            raise ValueError(f"expected position, texture coordinate and layer attributes, got {attributes!r}")
+        self.ctx = ctx
+        self.vertices = np.zeros(vertex_capacity, dtype=geometry.vertex_dtype(FORMAT))
+        self.indices = np.zeros(index_capacity, dtype=np.uint32)
+        self.vertex_count = 0
+        self.index_count = 0
+        self.entries: Dict[int, _Entry] = {}
+        # handles in buffer order
+        self._order: List[int] = []
+        self._next_handle = 0
+
+        self.vbo = ctx.buffer(reserve=self.vertices.nbytes, dynamic=True)
+        self.ibo = ctx.buffer(reserve=self.indices.nbytes, dynamic=True)
+        # without a layer input the layer is skipped as padding
+        fmt = FORMAT if len(attributes) == 3 else FORMAT.replace("1i", "x4")
+        self.vao = ctx.vertex_array(
+            program, [(self.vbo, fmt, *attributes)], index_buffer=self.ibo, index_element_size=4
+        )
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def add(self, mesh: geometry.Mesh, model: np.ndarray, layer: int = 0) -> int:
+        """Add ``mesh`` transformed by the ``pyrr`` matrix ``model``, textured with ``layer``; returns its handle."""
+        return self.extend(mesh, np.asarray(model, dtype=np.float32).reshape(1, 4, 4), layer)[0]
+
+    def extend(self, mesh: geometry.Mesh, models: np.ndarray, layers=0) -> List[int]:
+        """Add a copy of ``mesh`` per ``(N, 4, 4)`` model matrix in one pass; returns their handles.
+
+        :param layers: texture layer of each copy, a scalar or ``(N,)`` array.
+        """
+        models = np.asarray(models, dtype=np.float32).reshape(-1, 4, 4)
+        count = len(models)
+        rows = geometry.dequantize(mesh.vertices)
+        vertex_count, index_count = len(rows), len(mesh.indices)
+        first_vertex, first_index = self.vertex_count, self.index_count
+        self._reserve(first_vertex + count * vertex_count, first_index + count * index_count)
+
+        # row vectors, as pyrr lays out its matrices: world = (position, 1) @ model
+        vertices = self.vertices[first_vertex : first_vertex + count * vertex_count].reshape(count, vertex_count)
+        vertices["a0"] = rows[:, :3] @ models[:, :3, :3] + models[:, 3:, :3]
+        vertices["a1"] = rows[:, 3:5]
+        vertices["a2"] = np.broadcast_to(np.asarray(layers, dtype=np.int32), (count,))[:, None, None]
+        bases = first_vertex + vertex_count * np.arange(count, dtype=np.uint32)
+        indices = mesh.indices.astype(np.uint32) + bases[:, None]
+        self.indices[first_index : first_index + count * index_count] = indices.reshape(-1)
+
+        handles = list(range(self._next_handle, self._next_handle + count))
+        self._next_handle += count
+        for copy, handle in enumerate(handles):
+            self.entries[handle] = _Entry(
+                first_vertex + copy * vertex_count, vertex_count, first_index + copy * index_count, index_count
+            )
+        self._order.extend(handles)
+        self.vertex_count += count * vertex_count
+        self.index_count += count * index_count
+        self._upload(first_vertex, self.vertex_count, first_index, self.index_count)
+        return handles
+
+    def remove(self, handle: int) -> None:
+        """Take the entry ``handle`` out of the batch."""
+        entry = self.entries.pop(handle)
+        position = self._order.index(handle)
+        last = self.entries.get(self._order[-1])
+        end_vertex, end_index = self.vertex_count - entry.vertex_count, self.index_count - entry.index_count
+        if last is None:
+            # the removed entry was the last one
+            self._order.pop()
+        elif (last.vertex_count, last.index_count) == (entry.vertex_count, entry.index_count):
+            self._order[position] = self._order.pop()
+            self._move(last, entry.first_vertex, entry.first_index)
+            self._upload(
+                entry.first_vertex, entry.first_vertex + entry.vertex_count,
+                entry.first_index, entry.first_index + entry.index_count,
+            )
+        else:
+            del self._order[position]
+            # numpy copies overlapping ranges correctly
+            self.vertices[entry.first_vertex : end_vertex] = self.vertices[
+                entry.first_vertex + entry.vertex_count : self.vertex_count
+            ]
+            self.indices[entry.first_index : end_index] = (
+                self.indices[entry.first_index + entry.index_count : self.index_count] - entry.vertex_count
+            )
+            for later in self._order[position:]:
+                self.entries[later].first_vertex -= entry.vertex_count
+                self.entries[later].first_index -= entry.index_count
+            self._upload(entry.first_vertex, end_vertex, entry.first_index, end_index)
+        self.vertex_count, self.index_count = end_vertex, end_index
+
+    def render(self, mode: int = moderngl.TRIANGLES) -> None:
+        """Draw every entry of the batch with one call."""
+        if self.index_count:
+            self.vao.render(mode, vertices=self.index_count)
+
+    def _move(self, entry: _Entry, first_vertex: int, first_index: int) -> None:
+        vertices = slice(entry.first_vertex, entry.first_vertex + entry.vertex_count)
+        indices = slice(entry.first_index, entry.first_index + entry.index_count)
+        self.vertices[first_vertex : first_vertex + entry.vertex_count] = self.vertices[vertices]
+        self.indices[first_index : first_index + entry.index_count] = (
+            self.indices[indices] - np.uint32(entry.first_vertex) + np.uint32(first_vertex)
+        )
+        entry.first_vertex, entry.first_index = first_vertex, first_index
+
+    def _reserve(self, vertex_count: int, index_count: int) -> None:
+        """Grow the CPU copies and the buffers, keeping their contents, to hold at least the given counts."""
+        if vertex_count > len(self.vertices):
+            self.vertices = np.resize(self.vertices, max(vertex_count, 2 * len(self.vertices)))
+            # same buffer object, new storage: the vertex array stays valid
+            self.vbo.orphan(self.vertices.nbytes)
+            self.vbo.write(self.vertices[: self.vertex_count])
+        if index_count > len(self.indices):
+            self.indices = np.resize(self.indices, max(index_count, 2 * len(self.indices)))
+            self.ibo.orphan(self.indices.nbytes)
+            self.ibo.write(self.indices[: self.index_count])
+
+    def _upload(self, first_vertex: int, end_vertex: int, first_index: int, end_index: int) -> None:
+        if end_vertex > first_vertex:
+            self.vbo.write(self.vertices[first_vertex:end_vertex], offset=first_vertex * self.vertices.itemsize)
+        if end_index > first_index:
+            self.ibo.write(self.indices[first_index:end_index], offset=first_index * self.indices.itemsize)
+
+    def release(self) -> None:
+        self.vao.release()
+        self.vbo.release()
+        self.ibo.release()
@@ -0,0 +1,28 @@
+"""Summary statistics for frame and pass timings."""
+from typing import Dict, Iterable
+
+import numpy as np
+
+
+def summarize(samples: Iterable[float], scale: float = 1e3) -> Dict[str, float]:
+    """Percentiles, mean and variance of ``samples``.
+
+    :param samples: timings in seconds.
+    :param scale: unit conversion applied to the result, milliseconds by default
+        (variance is scaled by ``scale ** 2``).
+    """
+    values = np.asarray(list(samples), dtype=np.float64) * scale
+    if values.size == 0:
+        return {"count": 0}
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {
+        "count": int(values.size),
+        "mean": float(values.mean()),
+        "min": float(values.min()),
+        "max": float(values.max()),
+        "p50": float(p50),
+        "p95": float(p95),
+        "p99": float(p99),
+        "variance": float(values.var()),
+        "std": float(values.std()),
+    }
@@ -0,0 +1,277 @@
+"""Texture loading through a cache of upload-ready pixels.
+
+The lessons decode their textures with
+
+    Image.open(path).convert("RGBA").transpose(Image.FLIP_TOP_BOTTOM).tobytes()
+
+on every launch: PNG decode, conversion, flip and a copy into ``bytes``. The
+first load here does exactly that once and stores the resulting RGBA8 rows as
+a ``.npy`` file in a ``.cache`` directory next to the source image. Later loads
+memory-map that file and hand the map straight to ``ctx.texture``, so pixels go
+from the page cache to the driver without any intermediate copy.
+
+A cache entry is reused while the source's mtime and size are unchanged. If
+only the mtime changed (a fresh checkout, ``touch``), the source is hashed and
+the entry is kept when the content is the same.
+
+Textures get a mipmap chain according to :data:`SAMPLING`, so minified
+textures (cubes far down the cube fields) read from a small level instead of
+aliasing over the full-resolution one. Anisotropic filtering is opt-in: Mesa's
+llvmpipe can spend tens of seconds on a single frame in which a textured face
+is seen almost edge-on with it enabled.
+
+:func:`load_texture_array` packs same-sized images into the layers of one
+``TextureArray``, so cubes with different materials are drawn by a single
+instanced call, each instance picking its layer, with no texture rebinding.
+
+After :func:`share_textures`, a context hands out one texture per image and
+sampling settings, so lessons run one after the other in a shared context
+(``python -m learn_opengl``) upload and mipmap each image only once.
+"""
+import contextlib
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import Optional, Sequence, Union
+
+import moderngl
+import numpy as np
+from PIL import Image
+
+from learn_opengl import startup
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = ".cache"
+
+#: Sampling applied by :func:`load_texture` to every lesson texture unless the
+#: call or :func:`set_sampling` for the context overrides it, e.g.
+#: ``SAMPLING["mipmap"] = False`` to compare without.
+SAMPLING = {
+    "mipmap": True,
+    # 1.0 disables anisotropic filtering, e.g. 8.0 enables it (clamped to ctx.max_anisotropy)
+    "anisotropy": 1.0,
+}
+
+
+def _sha1(path: Path) -> str:
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def decode(path: Union[str, Path], flip: bool = True) -> np.ndarray:
+    """Decode ``path`` to an ``(height, width, 4)`` uint8 array, bottom row first when ``flip``."""
+    img = Image.open(path).convert("RGBA")
+    if flip:
+        img = img.transpose(Image.FLIP_TOP_BOTTOM)
+    return np.asarray(img)
+
+
+def cache_paths(path: Union[str, Path], flip: bool = True):
+    """``(pixels, metadata)`` paths of the cache entry for ``path``."""
+    path = Path(path)
+    stem = path.name + (".flipped" if flip else "")
+    cache_dir = path.parent / CACHE_DIR
+    return cache_dir / f"{stem}.npy", cache_dir / f"{stem}.json"
+
+
+def load_pixels(path: Union[str, Path], flip: bool = True) -> np.ndarray:
+    """Upload-ready ``(height, width, 4)`` uint8 pixels of ``path``, memory-mapped from the cache."""
+    path = Path(path)
+    pixels_path, meta_path = cache_paths(path, flip)
+    stat = path.stat()
+    try:
+        meta = json.loads(meta_path.read_text())
+    except (OSError, ValueError):
+        meta = None
+
+    if meta is not None and pixels_path.exists():
+        if meta["mtime_ns"] == stat.st_mtime_ns and meta["size"] == stat.st_size:
+            return np.load(pixels_path, mmap_mode="r")
+        if meta["size"] == stat.st_size and meta["sha1"] == _sha1(path):
+            meta["mtime_ns"] = stat.st_mtime_ns
+            _write_atomic(meta_path, json.dumps(meta).encode())
+            return np.load(pixels_path, mmap_mode="r")
+
+    pixels = decode(path, flip)
+    meta = {
+        "source": path.name,
+        "mtime_ns": stat.st_mtime_ns,
+        "size": stat.st_size,
+        "sha1": _sha1(path),
+        "flip": flip,
+        "shape": list(pixels.shape),
+    }
+    try:
+        pixels_path.parent.mkdir(exist_ok=True)
+        _write_atomic(pixels_path, pixels)
+        _write_atomic(meta_path, json.dumps(meta).encode())
+    except OSError as exc:
+        logger.warning("cannot cache %s: %s", path, exc)
+        return pixels
+    logger.info("cached %s as %s", path, pixels_path)
+    return np.load(pixels_path, mmap_mode="r")
+
+
+def _write_atomic(path: Path, data: Union[bytes, np.ndarray]) -> None:
+    """Write ``data`` (an array as ``.npy``) to a temporary file, then rename it to ``path``.
+
+    Every writer gets a temporary file of its own, so processes filling the
+    same cache entry at once neither collide nor expose a half-written file.
+    """
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f"{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            if isinstance(data, np.ndarray):
+                np.save(f, data)
+            else:
+                f.write(data)
+        os.replace(tmp, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.unlink(tmp)
+        raise
+
+
+def load_texture(
+    ctx: moderngl.Context,
+    path: Union[str, Path],
+    flip: bool = True,
+    mipmap: Optional[bool] = None,
+    anisotropy: Optional[float] = None,
+) -> moderngl.Texture:
+    """RGBA8 texture of the image at ``path``, a drop-in for ``ctx.texture(img.size, 4, img.tobytes())``.
+
+    ``mipmap`` and ``anisotropy`` default to :data:`SAMPLING` and the
+    :func:`set_sampling` overrides of ``ctx``; in the lazy startup mode the
+    mipmaps are built after the first frame (see :func:`learn_opengl.startup.defer`).
+    """
+    mipmap, anisotropy = _sampling(ctx, mipmap, anisotropy)
+    key = ("texture", str(Path(path).resolve()), flip, mipmap, anisotropy)
+    texture = _shared_texture(ctx, key)
+    if texture is not None:
+        return texture
+    pixels = load_pixels(path, flip)
+    height, width = pixels.shape[:2]
+    texture = ctx.texture((width, height), components=4, data=pixels)
+    _defer_sampling(texture, mipmap, anisotropy)
+    return _keep_texture(ctx, key, texture)
+
+
+def load_texture_array(
+    ctx: moderngl.Context,
+    paths: Sequence[Union[str, Path]],
+    flip: bool = True,
+    mipmap: Optional[bool] = None,
+    anisotropy: Optional[float] = None,
+) -> moderngl.TextureArray:
+    """RGBA8 texture array with the image at ``paths[i]`` in layer ``i``.
+
+    All images must have the same size. Each layer is uploaded straight from
+    its memory-mapped cache entry. ``mipmap`` and ``anisotropy`` are applied as
+    by :func:`load_texture`.
+    """
+    mipmap, anisotropy = _sampling(ctx, mipmap, anisotropy)
+    key = ("texture_array", tuple(str(Path(path).resolve()) for path in paths), flip, mipmap, anisotropy)
+    texture = _shared_texture(ctx, key)
+    if texture is not None:
+        return texture
+    layers = [load_pixels(path, flip) for path in paths]
+    if not layers:
+        raise ValueError("a texture array needs at least one image")
+    height, width = layers[0].shape[:2]
+    for path, pixels in zip(paths, layers):
+        if pixels.shape[:2] != (height, width):
+            raise ValueError(
+                f"{path} is {pixels.shape[1]}x{pixels.shape[0]}, the texture array layers are {width}x{height}"
+            )
+
+    texture = ctx.texture_array((width, height, len(layers)), components=4)
+    for layer, pixels in enumerate(layers):
+        texture.write(pixels, viewport=(0, 0, layer, width, height, 1))
+    _defer_sampling(texture, mipmap, anisotropy)
+    return _keep_texture(ctx, key, texture)
+
+
+def share_textures(ctx: moderngl.Context) -> None:
+    """Make :func:`load_texture` and :func:`load_texture_array` reuse textures on ``ctx``.
+
+    The cache lives in ``ctx.extra``. A texture handed out again gets its
+    wrapping, filter and anisotropy put back first, since lessons change them.
+    """
+    if ctx.extra is None:
+        ctx.extra = {}
+    ctx.extra.setdefault(__name__, {})
+
+
+def set_sampling(ctx: moderngl.Context, **sampling) -> None:
+    """Override :data:`SAMPLING` keys for the textures loaded on ``ctx`` from now on; no keys drops the overrides."""
+    unknown = set(sampling) - set(SAMPLING)
+    if unknown:
+        raise TypeError(f"unknown sampling settings {sorted(unknown)}")
+    if ctx.extra is None:
+        ctx.extra = {}
+    ctx.extra[f"{__name__}.sampling"] = sampling
+
+
+def _sampling(ctx: moderngl.Context, mipmap: Optional[bool], anisotropy: Optional[float]):
+    defaults = {**SAMPLING, **(ctx.extra or {}).get(f"{__name__}.sampling", {})}
+    mipmap = defaults["mipmap"] if mipmap is None else mipmap
+    anisotropy = defaults["anisotropy"] if anisotropy is None else anisotropy
+    return mipmap, anisotropy
+
+
+def _shared_texture(ctx: moderngl.Context, key):
+    texture = (ctx.extra or {}).get(__name__, {}).get(key)
+    if texture is not None:
+        mipmap, anisotropy = key[-2:]
+        texture.repeat_x = texture.repeat_y = True
+        texture.filter = (moderngl.LINEAR_MIPMAP_LINEAR if mipmap else moderngl.LINEAR, moderngl.LINEAR)
+        texture.anisotropy = min(max(anisotropy, 1.0), ctx.max_anisotropy)
+    return texture
+
+
+def _keep_texture(ctx: moderngl.Context, key, texture):
+    cache = (ctx.extra or {}).get(__name__)
+    if cache is not None:
+        cache[key] = texture
+    return texture
+
+
+def apply_sampling(texture, mipmap: Optional[bool] = None, anisotropy: Optional[float] = None) -> None:
+    """Build mipmaps and set anisotropy on ``texture`` (a ``Texture`` or ``TextureArray``)."""
+    mipmap, anisotropy = _sampling(texture.ctx, mipmap, anisotropy)
+    if mipmap:
+        # also switches the min filter to LINEAR_MIPMAP_LINEAR
+        texture.build_mipmaps()
+    if anisotropy > 1.0:
+        texture.anisotropy = min(anisotropy, texture.ctx.max_anisotropy)
+
+
+def _defer_sampling(texture, mipmap: bool, anisotropy: float) -> None:
+    """:func:`apply_sampling` with the mipmap build passed to :func:`learn_opengl.startup.defer`.
+
+    Until then the texture has its base level only (``max_level`` 0) and
+    already the mipmap filter, so that a filter the lesson sets meanwhile is
+    kept, as it would be after an immediate build.
+    """
+    apply_sampling(texture, mipmap=False, anisotropy=anisotropy)
+    if not mipmap:
+        return
+    # generates no level, only sets the filter
+    texture.build_mipmaps(0, 0)
+    loaded = texture.filter
+
+    def build():
+        current = texture.filter
+        texture.build_mipmaps()
+        if current != loaded:
+            texture.filter = current
+
+    startup.defer(texture.ctx, build)
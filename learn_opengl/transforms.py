@@ -0,0 +1,103 @@
+"""Vectorized model-matrix kernels for many objects at once.
+
+The lessons build model matrices one object at a time with ``pyrr``:
+
+    model = pyrr.matrix44.create_from_axis_rotation(axis, theta)
+    model = model.dot(pyrr.matrix44.create_from_translation(position))
+
+The functions below produce exactly the same matrices (``pyrr`` row-major
+layout, ready to be uploaded with ``.tobytes()`` or written into a per-instance
+``16f/i`` buffer) for ``N`` objects in a single NumPy pass. Inputs are
+structure-of-arrays: one ``(N, 3)`` array per quantity, split into component
+columns internally. Results are written into a preallocated ``(N, 4, 4)``
+float32 ``out`` array so a render loop does not allocate the result every
+frame.
+"""
+import numpy as np
+
+
+def empty_models(count: int) -> np.ndarray:
+    """Allocate an ``(count, 4, 4)`` float32 array suitable as ``out``."""
+    return np.empty((count, 4, 4), dtype=np.float32)
+
+
+def _prepare_out(out, count):
+    if out is None:
+        out = empty_models(count)
+    elif out.shape != (count, 4, 4) or out.dtype != np.float32:
+        raise ValueError(f"out must be a float32 array of shape ({count}, 4, 4), got {out.dtype} {out.shape}")
+    return out
+
+
+def _write_translation(out, positions):
+    # rotation first, then translation: the translation lands in the last row
+    out[:, 0:3, 3] = 0.0
+    out[:, 3, 0:3] = positions
+    out[:, 3, 3] = 1.0
+
+
+def from_axis_rotations(positions, axes, theta, out=None) -> np.ndarray:
+    """Batch version of ``create_from_axis_rotation(axis, theta).dot(create_from_translation(position))``.
+
+    :param positions: ``(N, 3)`` translations.
+    :param axes: ``(N, 3)`` rotation axes, normalized here (``(3,)`` is broadcast).
+    :param theta: rotation angle in radians, a scalar or ``(N,)`` array.
+    :param out: optional preallocated ``(N, 4, 4)`` float32 array.
+    """
+    positions = np.asarray(positions, dtype=np.float32)
+    count = len(positions)
+    out = _prepare_out(out, count)
+
+    axes = np.broadcast_to(np.asarray(axes, dtype=np.float32), (count, 3))
+    axes = axes / np.linalg.norm(axes, axis=1, keepdims=True)
+    x, y, z = axes.T
+
+    s = np.sin(theta, dtype=np.float32)
+    c = np.cos(theta, dtype=np.float32)
+    t = 1.0 - c
+    xt, yt, zt = x * t, y * t, z * t
+    xs, ys, zs = x * s, y * s, z * s
+
+    out[:, 0, 0] = x * xt + c
+    out[:, 0, 1] = y * xt + zs
+    out[:, 0, 2] = z * xt - ys
+    out[:, 1, 0] = x * yt - zs
+    out[:, 1, 1] = y * yt + c
+    out[:, 1, 2] = z * yt + xs
+    out[:, 2, 0] = x * zt + ys
+    out[:, 2, 1] = y * zt - xs
+    out[:, 2, 2] = z * zt + c
+    _write_translation(out, positions)
+    return out
+
+
+def from_eulers(positions, eulers, time=1.0, out=None) -> np.ndarray:
+    """Batch version of ``create_from_eulers(eulers * time).dot(create_from_translation(position))``.
+
+    :param positions: ``(N, 3)`` translations.
+    :param eulers: ``(N, 3)`` euler angles in ``pyrr`` order (roll, pitch, yaw),
+        in radians; ``(3,)`` is broadcast to every object.
+    :param time: scale applied to the angles, e.g. the timer value for
+        constant angular speeds.
+    :param out: optional preallocated ``(N, 4, 4)`` float32 array.
+    """
+    positions = np.asarray(positions, dtype=np.float32)
+    count = len(positions)
+    out = _prepare_out(out, count)
+
+    eulers = np.broadcast_to(np.asarray(eulers, dtype=np.float32), (count, 3))
+    angles = eulers.T * np.float32(time)
+    sR, sP, sY = np.sin(angles)
+    cR, cP, cY = np.cos(angles)
+
+    out[:, 0, 0] = cY * cP
+    out[:, 0, 1] = -cY * sP * cR + sY * sR
+    out[:, 0, 2] = cY * sP * sR + sY * cR
+    out[:, 1, 0] = sP
+    out[:, 1, 1] = cP * cR
+    out[:, 1, 2] = -cP * sR
+    out[:, 2, 0] = -sY * cP
+    out[:, 2, 1] = sY * sP * cR + cY * sR
+    out[:, 2, 2] = -sY * sP * sR + cY * cR
+    _write_translation(out, positions)
+    return out
@@ -0,0 +1,96 @@
+"""Uniform blocks shared by every program of a context.
+
+Instead of each lesson writing ``prog["view"]`` and ``prog["projection"]``
+into its one program, the camera lives in a std140 uniform buffer::
+
+    layout (std140) uniform Camera
+    {
+        mat4 view;
+        mat4 projection;
+        mat4 view_projection;
+        vec3 eye;
+        float time;
+    };
+
+bound to :data:`CAMERA_BINDING`. Programs built by
+:mod:`learn_opengl.programs` have their ``Camera`` block pointed at that
+binding automatically, so one :meth:`CameraBlock.update` per frame, a single
+``buffer.write``, reaches every program and pass that declares the block::
+
+    camera_block = uniforms.camera_block(ctx)
+    camera_block.update(view=look_at, projection=perspective, time=timer.time)
+"""
+from typing import Optional
+
+import moderngl
+import numpy as np
+
+#: Binding point of the ``Camera`` uniform block
+CAMERA_BINDING = 0
+
+#: Block name -> binding point, applied to every program of the registry
+BLOCK_BINDINGS = {"Camera": CAMERA_BINDING}
+
+#: std140 layout of the ``Camera`` block: mat4s take 64 bytes, the vec3 is
+#: 16-byte aligned and the float packs into its last 4 bytes
+CAMERA_DTYPE = np.dtype(
+    [
+        ("view", np.float32, (4, 4)),
+        ("projection", np.float32, (4, 4)),
+        ("view_projection", np.float32, (4, 4)),
+        ("eye", np.float32, 3),
+        ("time", np.float32),
+    ]
+)
+
+
+class CameraBlock:
+    """CPU copy and uniform buffer of the ``Camera`` block of one context."""
+
+    def __init__(self, ctx: moderngl.Context, binding: int = CAMERA_BINDING):
+        self.data = np.zeros((), dtype=CAMERA_DTYPE)
+        self.data["view"] = np.eye(4, dtype=np.float32)
+        self.data["projection"] = np.eye(4, dtype=np.float32)
+        self.data["view_projection"] = np.eye(4, dtype=np.float32)
+        self.buffer = ctx.buffer(self.data, dynamic=True)
+        self.buffer.bind_to_uniform_block(binding)
+
+    def update(
+        self,
+        view: Optional[np.ndarray] = None,
+        projection: Optional[np.ndarray] = None,
+        eye: Optional[np.ndarray] = None,
+        time: Optional[float] = None,
+    ) -> None:
+        """Change the given fields and upload the whole block with one write.
+
+        Matrices are ``pyrr`` row-major, as they were written to ``prog["view"]``.
+        Without ``eye``, a new ``view`` also sets the eye position it was built from.
+        """
+        data = self.data
+        if view is not None:
+            view = np.asarray(view, dtype=np.float32).reshape(4, 4)
+            data["view"] = view
+            if eye is None:
+                # view = [[R, 0], [-eye @ R, 1]] for an orthonormal rotation R
+                eye = -view[3, :3] @ view[:3, :3].T
+        if projection is not None:
+            data["projection"] = np.asarray(projection, dtype=np.float32).reshape(4, 4)
+        if view is not None or projection is not None:
+            # row vectors: clip = position @ view @ projection
+            data["view_projection"] = data["view"] @ data["projection"]
+        if eye is not None:
+            data["eye"] = eye
+        if time is not None:
+            data["time"] = time
+        self.buffer.write(data)
+
+
+def camera_block(ctx: moderngl.Context) -> CameraBlock:
+    """The camera block of ``ctx``, created and bound on first use and kept in ``ctx.extra``."""
+    if ctx.extra is None:
+        ctx.extra = {}
+    block = ctx.extra.get(__name__)
+    if block is None:
+        block = ctx.extra[__name__] = CameraBlock(ctx)
+    return block